@@ -0,0 +1,76 @@
+"""
+collecting live data samples into DeviceData and serializing it, compared with the previous implementation that
+built and recursively merged one nested dict per sample.
+
+    python -m benchmarks.live_data_store --samples 100000
+"""
+import argparse
+import json
+import time
+from src.device_data import DeviceData
+from src.module_data import LiveData, LiveDataBatch, ModuleData
+from src.utilities import Utilities
+
+METRICS = ["in_bytes_per_second", "out_bytes_per_second", "in_errors_per_second", "out_errors_per_second"]
+
+
+def samples(count: int, interfaces: int, depth: int) -> list:
+    """counters of interfaces that are mapped below depth - 1 levels of groups"""
+    live_data_list = []
+    for c_sample in range(count):
+        interface = c_sample // len(METRICS) % interfaces
+        mapping = tuple(f"group{interface % (c_level + 2)}" for c_level in range(depth - 1)) + (f"if{interface}",)
+        live_data_list.append(LiveData(METRICS[c_sample % len(METRICS)], float(c_sample), mapping,
+                                       1700000000.0 + c_sample // (len(METRICS) * interfaces)))
+    return live_data_list
+
+
+def parser_before(live_data_list: list) -> dict:
+    output = {}
+    for live_data in live_data_list:
+        current_layer = {}
+        c_output_layer = current_layer
+        for c_mapping in live_data.mapping:
+            c_output_layer[c_mapping] = {}
+            c_output_layer = c_output_layer[c_mapping]
+        c_output_layer[live_data.name] = {live_data.timestamp: live_data.value}
+        Utilities.update_multidimensional_dict(output, current_layer)
+    return output
+
+
+def collect_before(cycles: list) -> str:
+    live_data = {}
+    for live_data_list in cycles:
+        Utilities.update_multidimensional_dict(live_data, parser_before(live_data_list))
+    return json.dumps(live_data)
+
+
+def collect(cycles: list) -> str:
+    device_data = DeviceData()
+    for live_data_list in cycles:
+        device_data.add_module_data(ModuleData({}, live_data_list, []))
+    return json.dumps(device_data.serialize()["live_data"])
+
+
+def measure(name: str, func, cycles: list) -> str:
+    start = time.perf_counter()
+    result = func(cycles)
+    print(f"{name:<24} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--interfaces", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=2, help="length of the mapping tuples")
+    parser.add_argument("--cycles", type=int, default=10, help="module results the samples are split into")
+    args = parser.parse_args()
+
+    live_data_list = samples(args.samples, args.interfaces, args.depth)
+    size = len(live_data_list) // args.cycles
+    cycles = [live_data_list[c_cycle * size:(c_cycle + 1) * size] for c_cycle in range(args.cycles)]
+    print(f"{len(live_data_list)} samples in {args.cycles} cycles, mapping depth {args.depth}")
+    before = measure("nested merge before", collect_before, cycles)
+    assert before == measure("store", collect, cycles)
+    assert before == measure("store from batches", collect, [LiveDataBatch(cycle) for cycle in cycles])
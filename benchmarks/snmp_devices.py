@@ -0,0 +1,133 @@
+"""
+latency and throughput of the SNMP data sources and of a full SNMP worker cycle against simulated devices
+(tools.snmp_simulator, started in a child process so the agents do not share the interpreter of the client).
+
+    python -m benchmarks.snmp_devices --devices 1 100 1000 --runtimes threading asyncio --interfaces 24
+
+threading polls with the blocking DataSources in a pool of SNMP_POOL_SIZE threads like the threading runtime,
+asyncio polls with AsyncDataSources on one event loop limited by the snmp worker pool like the asyncio runtime.
+latency is measured per call once a pool slot is free, throughput is calls per second of wall time
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("LOG_LEVEL", "4")  # the data sources log their results on every call
+
+from src.modules.helpers.snmp import SNMP, AsyncSNMP, DataSources, AsyncDataSources  # noqa: E402
+from src.modules.snmp import SNMP as SNMPModule  # noqa: E402
+from src.worker_pools import WorkerPools  # noqa: E402
+
+OPERATIONS = ["get_interfaces", "get_ip_addresses", "worker"]
+
+
+def start_simulator(devices: int, first_port: int, interfaces: int, latency: float, loss: float):
+    process = subprocess.Popen([sys.executable, "-m", "tools.snmp_simulator", "--agents", str(devices),
+                                "--first-port", str(first_port), "--interfaces", str(interfaces),
+                                "--latency", str(latency), "--loss", str(loss)],
+                               stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # the simulator prints one line once all agents listen
+    return process
+
+
+def create_module(port: int) -> SNMPModule:
+    return SNMPModule("127.0.0.1", 60, {"SNMP_COMMUNITY": "public", "SNMP_PORT": port})
+
+
+def report(devices: int, runtime: str, operation: str, latencies: list, wall: float):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{devices:>7} {runtime:<10} {operation:<17} {len(latencies) / wall:10.1f} calls/s "
+          f"p50 {statistics.median(latencies) * 1000:9.2f} ms  p99 {p99 * 1000:9.2f} ms")
+
+
+def run_threading(devices: int, first_port: int, rounds: int):
+    ports = range(first_port, first_port + devices)
+    clients = [SNMP("public", "127.0.0.1", port) for port in ports]
+    data_sources = [DataSources(client) for client in clients]
+    modules = [create_module(port) for port in ports]
+    calls = {
+        "get_interfaces": [c_ds.get_interfaces for c_ds in data_sources],
+        "get_ip_addresses": [c_ds.get_ip_addresses for c_ds in data_sources],
+        "worker": [module.worker for module in modules]
+    }
+
+    def timed(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=WorkerPools.get("snmp").max_workers) as executor:
+        for operation in OPERATIONS:
+            list(executor.map(timed, calls[operation]))  # warm up, the first call walks the static columns
+            start = time.perf_counter()
+            latencies = []
+            for _ in range(rounds):  # a device is polled by one worker at a time
+                latencies.extend(executor.map(timed, calls[operation]))
+            report(devices, "threading", operation, latencies, time.perf_counter() - start)
+    for client in clients:
+        client.close()
+    for module in modules:
+        module.close()
+
+
+async def run_asyncio(devices: int, first_port: int, rounds: int):
+    ports = range(first_port, first_port + devices)
+    clients = [AsyncSNMP("public", "127.0.0.1", port) for port in ports]
+    data_sources = [AsyncDataSources(client) for client in clients]
+    modules = [create_module(port) for port in ports]
+    module_data_sources = [AsyncDataSources(AsyncSNMP("public", "127.0.0.1", port)) for port in ports]
+    calls = {
+        "get_interfaces": [c_ds.get_interfaces for c_ds in data_sources],
+        "get_ip_addresses": [c_ds.get_ip_addresses for c_ds in data_sources],
+        "worker": [lambda module=module, c_ds=c_ds: module.collect(c_ds)
+                   for module, c_ds in zip(modules, module_data_sources)]
+    }
+    pool = WorkerPools.get("snmp")
+
+    async def timed(func):
+        async with pool.limit():
+            start = time.perf_counter()
+            await func()
+            return time.perf_counter() - start
+
+    for operation in OPERATIONS:
+        await asyncio.gather(*[timed(func) for func in calls[operation]])
+        start = time.perf_counter()
+        latencies = []
+        for _ in range(rounds):
+            latencies.extend(await asyncio.gather(*[timed(func) for func in calls[operation]]))
+        report(devices, "asyncio", operation, latencies, time.perf_counter() - start)
+    for client in clients:
+        client.close()
+    for module in modules:
+        module.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--runtimes", nargs="+", choices=["threading", "asyncio"], default=["threading", "asyncio"])
+    parser.add_argument("--rounds", type=int, default=3, help="polling rounds over all devices per operation")
+    parser.add_argument("--interfaces", type=int, default=24, help="interfaces of every simulated device")
+    parser.add_argument("--latency", type=float, default=0, help="simulated network latency in seconds")
+    parser.add_argument("--loss", type=float, default=0, help="simulated packet loss ratio")
+    parser.add_argument("--first-port", type=int, default=20000)
+    args = parser.parse_args()
+
+    for device_count in args.devices:
+        simulator = start_simulator(device_count, args.first_port, args.interfaces, args.latency, args.loss)
+        try:
+            for runtime in args.runtimes:
+                if runtime == "threading":
+                    run_threading(device_count, args.first_port, args.rounds)
+                else:
+                    asyncio.run(run_asyncio(device_count, args.first_port, args.rounds))
+        finally:
+            simulator.terminate()
+            simulator.wait()
@@ -0,0 +1,66 @@
+"""
+per-GET cost of the SNMP helper with a new SnmpEngine/transport per request (old behaviour)
+and with src.modules.helpers.snmp.SNMP, whose AsyncSNMP client keeps one UDP socket per target and sends its
+own PDUs without a pysnmp engine, against a local pysnmp agent.
+
+    python -m benchmarks.snmp_engine_reuse --requests 200
+"""
+import argparse
+import threading
+import time
+from pysnmp.carrier.asyncore.dgram import udp
+from pysnmp.entity import engine, config
+from pysnmp.entity.rfc3413 import cmdrsp, context
+from pysnmp.hlapi import getCmd, SnmpEngine, CommunityData, UdpTransportTarget, ContextData, ObjectType, \
+    ObjectIdentity
+from src.modules.helpers.snmp import SNMP
+
+
+def start_agent(port: int, community: str = "public"):
+    """command responder that serves the SNMPv2-MIB of its own engine"""
+    agent = engine.SnmpEngine()
+    config.addTransport(agent, udp.domainName, udp.UdpTransport().openServerMode(("127.0.0.1", port)))
+    config.addV1System(agent, "benchmark-area", community)
+    config.addVacmUser(agent, 1, "benchmark-area", "noAuthNoPriv", (1, 3, 6, 1, 2, 1))
+    config.addVacmUser(agent, 2, "benchmark-area", "noAuthNoPriv", (1, 3, 6, 1, 2, 1))
+    snmp_context = context.SnmpContext(agent)
+    cmdrsp.GetCommandResponder(agent, snmp_context)
+    cmdrsp.NextCommandResponder(agent, snmp_context)
+    cmdrsp.BulkCommandResponder(agent, snmp_context)
+    agent.transportDispatcher.jobStarted(1)
+    threading.Thread(target=agent.transportDispatcher.runDispatcher, name="snmpAgent", daemon=True).start()
+    return agent
+
+
+def get_with_new_engine(port: int, community: str = "public"):
+    iterator = getCmd(SnmpEngine(), CommunityData(community, mpModel=0),
+                      UdpTransportTarget(("127.0.0.1", port), timeout=1, retries=5), ContextData(),
+                      ObjectType(ObjectIdentity("SNMPv2-MIB", "sysDescr", 0)))
+    error_indication, error_status, error_index, var_binds = next(iterator)
+    if error_indication or error_status:
+        raise Exception(error_indication or error_status.prettyPrint())
+    return var_binds[0][1].prettyPrint()
+
+
+def measure(name: str, func, requests: int):
+    func()  # warm up, MIB loading of the first call is not part of the per-GET cost
+    start = time.perf_counter()
+    for _ in range(requests):
+        func()
+    per_get = (time.perf_counter() - start) / requests
+    print(f"{name:<24} {per_get * 1000:8.3f} ms/GET  {1 / per_get:8.1f} GET/s")
+    return per_get
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=16161)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    start_agent(args.port)
+    snmp = SNMP("public", "127.0.0.1", args.port)
+    before = measure("new engine per GET", lambda: get_with_new_engine(args.port), args.requests)
+    after = measure("AsyncSNMP client", lambda: snmp.get_single_value_by_name("sysDescr"), args.requests)
+    print(f"speedup: {before / after:.1f}x")
+    snmp.close()
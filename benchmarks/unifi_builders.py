@@ -0,0 +1,89 @@
+"""
+lldp and vlan builders of the unifi module on a synthetic large controller, compared with the previous
+implementations that scanned all clients per lldp neighbor and the port/network configs per port.
+
+    python -m benchmarks.unifi_builders --switches 300 --clients 20000
+"""
+import argparse
+import random
+import time
+from src.modules.helpers.unifi_cache import UnifiSnapshot
+from src.modules.unifi import UnifiAPI, UnifiLLDP, UnifiVLAN
+
+
+def controller(switches: int, ports: int, clients: int, networks: int, seed: int = 1) -> UnifiSnapshot:
+    generator = random.Random(seed)
+    client_list = [{"mac": f"02:00:{c_client // 65536 % 256:02x}:{c_client // 256 % 256:02x}:{c_client % 256:02x}:01",
+                    "hostname": f"client-{c_client}"} for c_client in range(clients)]
+    network_list = [{"_id": f"network{c_network}", "name": f"vlan-{c_network}", "vlan": c_network + 2}
+                    for c_network in range(networks)]
+    port_conf = [{"_id": f"portconf{c_network}", "native_networkconf_id": f"network{c_network}"}
+                 for c_network in range(networks)] + [{"_id": "all"}]
+    devices = []
+    for c_switch in range(switches):
+        devices.append({
+            "ip": f"10.1.{c_switch // 256}.{c_switch % 256}",
+            "mac": f"f0:9f:c2:00:{c_switch // 256:02x}:{c_switch % 256:02x}",
+            "lldp_table": [{"chassis_id": generator.choice(client_list)["mac"], "local_port_idx": c_port,
+                            "port_id": f"eth{c_port}"} for c_port in range(1, ports + 1)],
+            "port_table": [{"port_idx": c_port, "name": f"Port {c_port}",
+                            "portconf_id": generator.choice(port_conf)["_id"]} for c_port in range(1, ports + 1)]
+        })
+    return UnifiSnapshot(devices, client_list, port_conf, network_list)
+
+
+def lldp_before(inventory: UnifiSnapshot, device_data: dict):
+    hostname = ""
+    lldp_list = []
+    for lldp_entry in device_data["lldp_table"]:
+        for clients in inventory.clients:
+            if clients["mac"] == lldp_entry["chassis_id"]:
+                if "hostname" in clients:
+                    hostname = clients["hostname"]
+                lldp_list.append(UnifiLLDP(local_mac=device_data["mac"], chassis_id=lldp_entry["chassis_id"],
+                                           remote_host=hostname, local_port_idx=lldp_entry["local_port_idx"],
+                                           port_id=lldp_entry["port_id"]).serialize())
+    output_data = {}
+    for c_lldp_data in lldp_list:
+        output_data.setdefault(c_lldp_data["local_port"], []).append(c_lldp_data)
+    return output_data
+
+
+def vlan_before(inventory: UnifiSnapshot, device_data: dict):
+    vlandata = []
+    for port in device_data["port_table"]:
+        admin_status = "down" if port["name"] == "Disabled" else "up"
+        port_conf_obj = next(obj for obj in inventory.port_conf if obj["_id"] == port["portconf_id"])
+        if "native_networkconf_id" in port_conf_obj:
+            network_obj = next(obj for obj in inventory.networks if obj["_id"] == port_conf_obj["native_networkconf_id"])
+            vlan = UnifiVLAN(local_port_name=port["port_idx"], vlan_name=network_obj["name"],
+                             vlan_id=network_obj["vlan"], admin_status=admin_status)
+            is_trunk = False
+        else:
+            vlan = UnifiVLAN(local_port_name=port["port_idx"], vlan_name="Default", vlan_id=-1,
+                             admin_status=admin_status)
+            is_trunk = True
+        vlandata.append({"port": port["port_idx"], "vlans": [vlan.serialize()], "is_trunk": is_trunk})
+    return vlandata
+
+
+def measure(name: str, func, inventory: UnifiSnapshot):
+    start = time.perf_counter()
+    results = [func(inventory, device_data) for device_data in inventory.devices]
+    print(f"{name:<24} {(time.perf_counter() - start) * 1000:10.1f} ms for {len(inventory.devices)} switches")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--switches", type=int, default=300)
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--clients", type=int, default=20000)
+    parser.add_argument("--networks", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    inventory = controller(args.switches, args.ports, args.clients, args.networks)
+    print(f"{'controller and indexes':<24} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    assert measure("lldp before", lldp_before, inventory) == measure("lldp", UnifiAPI.build_lldp_data, inventory)
+    assert measure("vlan before", vlan_before, inventory) == measure("vlan", UnifiAPI.build_vlan_data, inventory)
@@ -0,0 +1,107 @@
+"""
+parsing and port centric reformatting of large synthetic s350 "show vlan" outputs, compared with the previous
+implementations that searched a list of port names for every port of every vlan.
+
+    python -m benchmarks.vlan_reformat --units 8 --vlans 500
+"""
+import argparse
+import random
+import time
+from src.modules.helpers.s350_ssh_vlan import Vlan, VlanS350
+from src.modules.ssh import SSH
+
+FIELD_WIDTHS = [4, 18, 19, 19, 17]  # column widths of the s350 output, separated by one space
+
+
+def show_vlan_output(units: int, vlans: int, seed: int = 1) -> str:
+    """output of a stack of 52 port units where every vlan is tagged on some ranges and untagged on others"""
+    generator = random.Random(seed)
+    lines = ["Created by: D-Default, S-Static, G-GVRP, R-Radius Assigned VLAN, V-Voice VLAN", "",
+             "Vlan       Name           Tagged Ports      UnTagged Ports      Created by",
+             " ".join("-" * width for width in FIELD_WIDTHS)]
+    for c_vlan in range(1, vlans + 1):
+        tagged, untagged = [], []
+        for unit in range(1, units + 1):
+            start = generator.randint(1, 48)
+            ports = tagged if generator.random() < 0.5 else untagged
+            ports.append(f"gi{unit}/0/{start}-{generator.randint(start, 48)}")
+            ports.append(f"te{unit}/0/{generator.randint(1, 4)}")
+        tagged.append(f"Po{c_vlan % 8 + 1}")
+        tagged_lines, untagged_lines = wrap(tagged), wrap(untagged)
+        for c_line in range(max(len(tagged_lines), len(untagged_lines))):
+            fields = [str(c_vlan), f"vlan-{c_vlan}"] if c_line == 0 else ["", ""]
+            fields += [tagged_lines[c_line] if c_line < len(tagged_lines) else "",
+                       untagged_lines[c_line] if c_line < len(untagged_lines) else "",
+                       "S" if c_line == 0 else ""]
+            lines.append(" ".join(field.ljust(width) for field, width in zip(fields, FIELD_WIDTHS)))
+    return "\n".join(lines)
+
+
+def wrap(ports: list) -> list:
+    """comma separated ports split into lines that fit the port columns"""
+    lines = [""]
+    for port in ports:
+        if len(lines[-1]) + len(port) + 1 > FIELD_WIDTHS[2]:
+            lines.append("")
+        lines[-1] += f"{port},"
+    return lines
+
+
+def reformat_s350_before(vlan_data):
+    vlans = []
+    for vlan in vlan_data:
+        for is_trunk, vlan_ports in ((True, vlan["tagged_ports"]), (False, vlan["untagged_ports"])):
+            for vlan_port in vlan_ports:
+                port_names = [port["port"] for port in vlans]
+                if vlan_port in port_names:
+                    vlans[port_names.index(vlan_port)]["vlans"].append({"id": vlan["id"], "name": vlan["name"]})
+                else:
+                    vlans.append({"port": vlan_port, "vlans": [{"id": vlan["id"], "name": vlan["name"]}],
+                                  "is_trunk": is_trunk})
+    return vlans
+
+
+def reformat_napalm_before(vlans):
+    vlan_results = []
+    ports = []
+    for vlan_id, vlan_data in vlans.items():
+        for interface in vlan_data["interfaces"]:
+            if interface in ports:
+                vlan_results[ports.index(interface)]["vlans"].append({"id": vlan_id, "name": vlan_data["name"]})
+            else:
+                vlan_results.append({"port": interface, "vlans": [{"id": vlan_id, "name": vlan_data["name"]}]})
+                ports.append(interface)
+    return vlan_results
+
+
+def measure(name: str, func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"{name:<32} {(time.perf_counter() - start) / repeat * 1000:10.2f} ms")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=8, help="stacked units of 52 ports")
+    parser.add_argument("--vlans", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    driver = VlanS350(hostname="127.0.0.1", username="benchmark", password="benchmark")
+    output = show_vlan_output(args.units, args.vlans)
+    driver._send_command = lambda command: output
+    vlan_data = measure("parse show vlan", lambda: driver.get_vlan_data(expand_ports=True), args.repeat)
+    memberships = sum(len(vlan["tagged_ports"]) + len(vlan["untagged_ports"]) for vlan in vlan_data)
+    print(f"{len(vlan_data)} vlans, {memberships} port memberships")
+
+    before = measure("s350 reformat before", lambda: reformat_s350_before(vlan_data), args.repeat)
+    after = measure("s350 reformat", lambda: Vlan.reformat_vlan_data_to_port_centric_format(vlan_data), args.repeat)
+    assert before == after
+
+    napalm_vlans = {vlan["id"]: {"name": vlan["name"], "interfaces": vlan["tagged_ports"] + vlan["untagged_ports"]}
+                    for vlan in vlan_data}
+    before = measure("napalm reformat before", lambda: reformat_napalm_before(napalm_vlans), args.repeat)
+    after = measure("napalm reformat", lambda: SSH.reformat_vlan_data(napalm_vlans), args.repeat)
+    assert before == after
@@ -1,3 +1,5 @@
 from src.devicehandler import DeviceHandler
 
-moduleHandler = DeviceHandler()
\ No newline at end of file
+if __name__ == "__main__":
+    # shard processes are spawned and import this module again, they must not start an aggregator
+    moduleHandler = DeviceHandler()
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import time
+from decouple import config
+from src.utilities import Utilities
+
+
+class Cluster:
+    """
+    splits the devices of the backend between several aggregator instances. every device belongs to the live node
+    with the highest rendezvous hash, so adding or losing a node only moves the devices of that node.
+    nodes announce they are alive by writing a heartbeat file into a shared directory
+    """
+
+    def __init__(self, node_index: int = 0, node_count: int = 1, heartbeat_dir: str = None,
+                 heartbeat_timeout: int = 30):
+        self._logger = Utilities.setup_logger()
+        self.node_index = node_index
+        self.node_count = node_count
+        self.heartbeat_dir = heartbeat_dir
+        self.heartbeat_timeout = heartbeat_timeout
+        self.__live_nodes = None
+
+    @staticmethod
+    def from_config():
+        return Cluster(node_index=config("CLUSTER_NODE_INDEX", 0, cast=int),
+                       node_count=config("CLUSTER_NODE_COUNT", 1, cast=int),
+                       heartbeat_dir=config("CLUSTER_HEARTBEAT_DIR", "", cast=str) or None,
+                       heartbeat_timeout=config("CLUSTER_HEARTBEAT_TIMEOUT", 30, cast=int))
+
+    @property
+    def enabled(self):
+        return self.node_count > 1
+
+    def __heartbeat_file(self, node_index: int):
+        return os.path.join(self.heartbeat_dir, f"node-{node_index}.heartbeat")
+
+    def send_heartbeat(self):
+        os.makedirs(self.heartbeat_dir, exist_ok=True)
+        tmp_file = f"{self.__heartbeat_file(self.node_index)}.tmp"
+        with open(tmp_file, "w") as file:
+            file.write(str(time.time()))
+        os.replace(tmp_file, self.__heartbeat_file(self.node_index))  # readers never see a half written file
+
+    def live_nodes(self) -> list:
+        if not self.heartbeat_dir:
+            return list(range(self.node_count))
+        live_nodes = []
+        for c_node in range(self.node_count):
+            if c_node == self.node_index:
+                live_nodes.append(c_node)
+                continue
+            try:
+                with open(self.__heartbeat_file(c_node)) as file:
+                    if time.time() - float(file.read()) <= self.heartbeat_timeout:
+                        live_nodes.append(c_node)
+            except (OSError, ValueError):
+                pass
+        return live_nodes
+
+    @staticmethod
+    def owner(device_id, nodes: list) -> int:
+        return max(nodes, key=lambda c_node: hashlib.blake2b(f"{c_node}:{device_id}".encode(), digest_size=8).digest())
+
+    def filter_devices(self, devices: dict) -> dict:
+        if not self.enabled:
+            return devices
+        if self.heartbeat_dir:
+            self.send_heartbeat()
+        live_nodes = self.live_nodes()
+        if live_nodes != self.__live_nodes:
+            self._logger.info(f"cluster node {self.node_index}: live nodes {live_nodes}")
+            self.__live_nodes = live_nodes
+        return {device_id: device for device_id, device in devices.items()
+                if Cluster.owner(device_id, live_nodes) == self.node_index}
@@ -1,19 +1,24 @@
+import asyncio
 import threading
 import time
 from src.io import Config
 import json
 from src.utilities import Utilities
 from src.device_data import DeviceData
+from src.runtime import ThreadRuntime
+from src.worker_pools import WorkerPools
 import importlib
 
 
 class Device(threading.Thread):
 
-    def __init__(self, id_, name: str, ip: str, device_type: str, timeout: int, modules: dict, *args, **kwargs):
+    def __init__(self, id_, name: str, ip: str, device_type: str, timeout: int, modules: dict, runtime=None, *args,
+                 **kwargs):
         self._logger = Utilities.setup_logger(ip)
         self._module_config = Config("./src/config/modules.json").get_whole_file()
         self._workers = {}
         self.__data = DeviceData()
+        self.__data_lock = threading.Lock()  # modules, shard results and the upload drain use the data
         self.name = name
         self.id = id_
         self.ip = ip
@@ -22,6 +27,7 @@ class Device(threading.Thread):
         self.modules = modules
         self.running = True
         self._utilities = Utilities()
+        self.runtime = runtime if runtime else ThreadRuntime()
         super().__init__(*args, **kwargs)
 
     @property
@@ -82,12 +88,14 @@ class Device(threading.Thread):
 
     @property
     def data(self):
-        return self.__data.serialize(), self.__data.external_events
+        with self.__data_lock:
+            return self.__data.serialize(), self.__data.external_events
 
     @data.setter
     def data(self, module_name):
         module_data = self._workers[module_name].data
-        self.__data.add_module_data(module_data)
+        with self.__data_lock:
+            self.__data.add_module_data(module_data)
         # (module_data)
         # if module_data:
         #    self.__data["static_data"].update(module_data.static_data)
@@ -99,27 +107,60 @@ class Device(threading.Thread):
             self.get_data()
             self.check_modules()
             time.sleep(int(self.timeout))
-        worker_names = list(self._workers.keys())
-        for c_worker in worker_names:
-            self.stop_module(c_worker)
+        self.stop_modules()
 
-    def start_module(self, module):
+    async def run_async(self, runtime):
+        while self.running:
+            self.get_data()
+            await self.check_modules_async()
+            await asyncio.sleep(int(self.timeout))
+        self.stop_modules()
+
+    def run_scheduled(self, drift: float):
+        if not self.running:
+            self.stop_modules()
+            return None
+        self.get_data()
+        self.check_modules()
+        return int(self.timeout)
+
+    def create_module(self, module):
         c_module_import = self.import_module(module["name"])
         c_worker = c_module_import(ip=self.ip, timeout=self.timeout, config=module['config'])
         c_worker.name = f"{self.name}:{self._module_config[module['name']]['classname']}"
+        return c_worker
+
+    def start_module(self, module, c_worker=None):
+        if c_worker is None:
+            c_worker = self.create_module(module)
         self._workers[module["name"]] = c_worker
-        c_worker.start()
+        self.runtime.start(c_worker)
         self._logger.info(f"Started module {module['name']}")
 
+    def modules_to_start(self):
+        """configured modules that were not started yet or stopped"""
+        return [c_module for c_module in self.modules
+                if c_module["name"] not in self._workers or not self._workers[c_module['name']].is_running()
+                or not self.runtime.is_alive(self._workers[c_module['name']])]
+
     def check_modules(self):
         # start modules
+        for c_module in self.modules_to_start():
+            self.start_module(c_module)
+        self.update_modules()
+
+    async def check_modules_async(self):
+        # module constructors log in or fetch certificates, they must not block the other devices of the loop
+        for c_module in self.modules_to_start():
+            family = self.import_module(c_module["name"]).family
+            c_worker = await asyncio.wrap_future(WorkerPools.get(family).submit(self.create_module, c_module))
+            self.start_module(c_module, c_worker)
+        self.update_modules()
+
+    def update_modules(self):
         module_api_out = {}
         for c_module in self.modules:
             module_api_out[c_module["name"]] = {"config": c_module["config"]}
-            if c_module["name"] not in self._workers:
-                self.start_module(c_module)
-            if not self._workers[c_module['name']].is_running() or not self._workers[c_module['name']].is_alive():
-                self.start_module(c_module)
 
         # stop modules
         modules_to_stop = self._utilities.compare_list(self._workers.keys(), module_api_out.keys())
@@ -143,10 +184,26 @@ class Device(threading.Thread):
         self._workers.pop(module_name)
         self._logger.info(f"Stopped module {module_name}")
 
+    def stop_modules(self):
+        worker_names = list(self._workers.keys())
+        for c_worker in worker_names:
+            self.stop_module(c_worker)
+
     def get_data(self):
         for c_module in self._workers:
             self.data = c_module
             self._workers[c_module].clear_data()
 
     def clear_data(self):
-        self.__data = DeviceData()
+        with self.__data_lock:
+            self.__data = DeviceData()
+
+    def pop_data(self) -> DeviceData:
+        """the collected data, data added afterwards goes into the next upload"""
+        with self.__data_lock:
+            data, self.__data = self.__data, DeviceData()
+        return data
+
+    def add_data(self, device_data: DeviceData):
+        with self.__data_lock:
+            self.__data.add_module_data(device_data)
@@ -1,45 +1,51 @@
-from src.module_data import ModuleData, OutputType, LiveData, Event
+from __future__ import annotations
+from src.module_data import ModuleData, OutputType, LiveData, LiveDataBatch, Event
+from src.live_data_store import LiveDataStore
 from src.utilities import Utilities
 import json
+import logging
 import time
 import typing
 
 
 class DeviceData:
-    def __init__(self):
+    def __init__(self, buffer_size: int = None, aggregations: tuple = ()):
         self._logger = Utilities.setup_logger()
         self.static_data = {}
-        self.live_data = {}
+        self.live_data = LiveDataStore(buffer_size, aggregations)
         self.events = []
         self.external_events = {}
+        self.watermarks = {}
 
-    def add_module_data(self, module_data: ModuleData):
-        self.static_data.update(module_data.static_data)
+    def add_module_data(self, module_data: typing.Union[ModuleData, LiveDataBatch, DeviceData]):
+        if type(module_data) is not LiveDataBatch:
+            self.static_data.update(module_data.static_data)
         if type(module_data) is ModuleData:
             #self.add_live_data_or_event_list(module_data.live_data)
-            Utilities.update_multidimensional_dict(self.live_data,
-                                                   DeviceData.livedata_multidimensional_parser(module_data.live_data))
+            self.live_data.add_live_data(module_data.live_data)
             if module_data.output_type == OutputType.DEFAULT:
                 self.events.extend(module_data.events)
             elif module_data.output_type == OutputType.EXTERNAL_DATA_SOURCES:
-                self.external_events.update(module_data.events)
+                self.add_external_events(module_data.events)
+            self.watermarks.update(module_data.watermarks)
+        elif type(module_data) is LiveDataBatch:
+            self.live_data.add_live_data(module_data)
         elif type(module_data) is DeviceData:
-            self.live_data = Utilities.update_multidimensional_dict(self.live_data, module_data.live_data)
+            self.live_data.update(module_data.live_data)
             self.events.extend(module_data.events)
-            self.external_events.update(module_data.external_events)
+            self.add_external_events(module_data.external_events)
+            self.watermarks.update(module_data.watermarks)
+
+    def add_external_events(self, external_events: dict):
+        # appended, the events module only returns the events since its last run
+        for hostname, events in external_events.items():
+            self.external_events.setdefault(hostname, []).extend(events)
 
     @staticmethod
-    def livedata_multidimensional_parser(live_data_list: list[LiveData]):
-        output = {}
-        for live_data in live_data_list:
-            current_layer = {}
-            c_output_layer = current_layer
-            for c_mapping in live_data.mapping:
-                c_output_layer[c_mapping] = {}
-                c_output_layer = c_output_layer[c_mapping]
-            c_output_layer[live_data.name] = {live_data.timestamp: live_data.value}
-            Utilities.update_multidimensional_dict(output, current_layer)
-        return output
+    def livedata_multidimensional_parser(live_data_list: typing.Union[list[LiveData], LiveDataBatch]):
+        live_data = LiveDataStore()
+        live_data.add_live_data(live_data_list)
+        return live_data.serialize()
 
     @staticmethod
     def convert_to_key_value_list(input_dict: dict):
@@ -71,9 +77,7 @@ class DeviceData:
     def add_live_data_or_event_list(self, input_list: typing.Union[list[LiveData], list[Event]]):
         for item in input_list:
             if type(item) == LiveData:
-                if item.name not in self.live_data:
-                    self.live_data[item.name] = {}
-                self.live_data[item.name].update({item.timestamp: item.value})
+                self.live_data.add(item.name, (), item.timestamp, item.value)
             elif type(item) == Event:
                 self.events.append(item)
             else:
@@ -82,13 +86,27 @@ class DeviceData:
     def serialize(self):
         return {  # "static_data": self.convert_to_key_value_list(self.static_data),
             "static_data": self.static_data,
-            "live_data": self.live_data,
+            "live_data": self.live_data.serialize(),
             "events": [item.serialize() for item in self.events],
         }
 
+    def is_empty(self):
+        return not (self.static_data or self.live_data or self.events or self.external_events or self.watermarks)
+
+    def __getstate__(self):
+        # loggers can not be pickled, DeviceData is sent between processes in sharded mode
+        state = self.__dict__.copy()
+        del state["_logger"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # setup_logger adds a handler on every call, every batch from a shard would add one more
+        self._logger = logging.getLogger("netregator")
+
     def __str__(self):
         return json.dumps({"static_data": self.static_data,
-                           "live_data": self.live_data,
+                           "live_data": self.live_data.serialize(),
                            "events": self.events})
 
 if __name__ == "__main__":
@@ -1,8 +1,14 @@
 import threading
 import json
 from src.io import API, Config
+from src.cluster import Cluster
+from src.static_data_tracker import StaticDataTracker
+from src.event_deduplicator import EventDeduplicator
+from src.modules.helpers.zabbix_watermarks import ZabbixWatermarks
 from src.device import Device
+from src.runtime import create_runtime
 from src.utilities import Utilities
+from src.worker_pools import WorkerPools
 import time
 import os
 from decouple import config
@@ -22,6 +28,10 @@ class DeviceHandler:
         self._api = API()
         self._utilities = Utilities()
         self._modules = Config("./src/config/modules.json")
+        self._runtime = create_runtime()
+        self._cluster = Cluster.from_config()
+        self._static_data = StaticDataTracker.from_config()
+        self._events = EventDeduplicator.from_config()
         self.mainloop()
 
     def mainloop(self):
@@ -30,39 +40,77 @@ class DeviceHandler:
             time.sleep(1)
             self.set_version()
             self.set_modules()
+            last_metrics = time.monotonic()
             while self._running:
                 self.check_system_threads()
+                if time.monotonic() - last_metrics >= config("POOL_METRICS_INTERVAL", 60, cast=int):
+                    self._logger.info(f"worker pools: {json.dumps(WorkerPools.metrics())}")
+                    runtime_metrics = self._runtime.metrics()
+                    if runtime_metrics:
+                        self._logger.info(f"runtime: {json.dumps(runtime_metrics)}")
+                    last_metrics = time.monotonic()
                 time.sleep(5)
         except KeyboardInterrupt:
             os._exit(1)
 
     def get_data_from_devices(self):
         while True:
-            output = {}
-            devices = []
-            external_events = {}
-            for device_id in self._workers:
-                c_data, c_external_events = self._workers[device_id].data
-                self._workers[device_id].clear_data()
-                if c_data != {'static_data': [], 'live_data': [], 'events': {}}:
-                    current_metadata = {"id": device_id,
-                                        "name": self._workers[device_id].name,
-                                        "ip": self._workers[device_id].ip}
-                    current_metadata.update(c_data)
-                    devices.append(current_metadata)
-                self._workers[device_id].clear_data()
-                for c_hostname in c_external_events:
-                    if not c_hostname in external_events:
-                        external_events[c_hostname] = []
-                    external_events[c_hostname] = external_events[c_hostname] + c_external_events[c_hostname]
-
-            if devices != [] or external_events != {}:
-                output["devices"] = devices
-                output["external_events"] = external_events
-                self._api.send_data(output)
-                # print("--------------\n"*4)
-                self._logger.debug(json.dumps(output))
-            time.sleep(5)
+            self.send_device_data()
+            time.sleep(config("UPLOAD_INTERVAL", 5, cast=int))
+
+    def send_device_data(self):
+        output = {}
+        devices = []
+        external_events = {}
+        watermarks = {}
+        for device_id in self._workers:
+            # one swap under the lock of the device, shard results that arrive meanwhile go into the next upload
+            c_device_data = self._workers[device_id].pop_data()
+            c_data, c_external_events = c_device_data.serialize(), c_device_data.external_events
+            watermarks.update(c_device_data.watermarks)
+            if c_data != {'static_data': [], 'live_data': [], 'events': {}}:
+                current_metadata = {"id": device_id,
+                                    "name": self._workers[device_id].name,
+                                    "ip": self._workers[device_id].ip}
+                c_data["static_data"], unchanged = self._static_data.changed_sections(device_id, c_data["static_data"])
+                if unchanged:
+                    c_data["static_data_unchanged"] = unchanged
+                c_data["events"] = self._events.filter_events(device_id, c_data["events"])
+                current_metadata.update(c_data)
+                devices.append(current_metadata)
+            for c_hostname in c_external_events:
+                c_host_events = self._events.filter_events(c_hostname, c_external_events[c_hostname])
+                if not c_host_events:
+                    continue
+                if not c_hostname in external_events:
+                    external_events[c_hostname] = []
+                external_events[c_hostname] = external_events[c_hostname] + c_host_events
+
+        sent = True
+        if devices != [] or external_events != {}:
+            output["devices"] = devices
+            output["external_events"] = external_events
+            try:
+                sent = self._api.send_data(output)
+            except Exception as ex:
+                # connection errors and timeouts are raised by the session, the backend got nothing
+                self._logger.error(f"send_data: {ex}")
+                sent = False
+            if sent:
+                self._static_data.commit()
+                self._events.commit()
+                if self._api.resend_static_data:
+                    self._static_data.resend(None if self._api.resend_static_data is True
+                                             else self._api.resend_static_data)
+            else:
+                self._static_data.discard()
+                self._events.discard()
+            # print("--------------\n"*4)
+            self._logger.debug(json.dumps(output))
+        if sent:
+            # the events up to the watermarks were uploaded or suppressed, a failed upload fetches them again
+            for url, watermark in watermarks.items():
+                ZabbixWatermarks.set(url, watermark, self._logger)
 
     def check_devices(self):
         while True:
@@ -89,7 +137,7 @@ class DeviceHandler:
             # update timeout, modules and check for dead devices/threads and restart them
             for c_id in running_devices:
                 # check if device is still running. if not, restart it.
-                if not self._workers[c_id].is_alive() or not self._workers[c_id].running:
+                if not self._runtime.is_alive(self._workers[c_id]) or not self._workers[c_id].running:
                     c_id = self._workers[c_id].id
                     name = self._workers[c_id].name
                     device_type = self._workers[c_id].device_type
@@ -101,13 +149,14 @@ class DeviceHandler:
                 # update timeout
                 self._workers[c_id].timeout = running_devices[c_id]["timeout"]
                 self._workers[c_id].modules = running_devices[c_id]["modules"]
+                self._runtime.update(self._workers[c_id])
             time.sleep(5)
 
     def start_device(self, device: Device):
         c_device = Device(id_=device.id, name=device.name, ip=device.ip, device_type=device.device_type,
-                          timeout=device.timeout, modules=device.modules)
+                          timeout=device.timeout, modules=device.modules, runtime=self._runtime)
         self._workers[device.id] = c_device
-        self._workers[device.id].start()
+        self._runtime.start(c_device)
         self._logger.info(f"Started device {device.name}")
         return True
 
@@ -135,7 +184,9 @@ class DeviceHandler:
 
     def stop_device(self, device_id, device_name):
         self._workers[str(device_id)].running = False
+        self._runtime.stop(self._workers[str(device_id)])
         del self._workers[str(device_id)]
+        self._static_data.forget(device_id)
         self._logger.info(f"Stopped device {device_name}")
         return True
 
@@ -147,7 +198,7 @@ class DeviceHandler:
                 device_id = c_device["id"]
                 del c_device["id"]
                 output[device_id] = c_device
-        return output
+        return self._cluster.filter_devices(output)
 
     def set_version(self):
         self._api.send_version_string(config("VERSION"))
@@ -0,0 +1,59 @@
+import time
+from decouple import config
+
+
+class EventDeduplicator:
+    """
+    drops events that repeat an event of the same (host, information, severity) which was uploaded less than
+    EVENT_SUPPRESSION_WINDOW seconds ago. the first repeat after the window is uploaded again as heartbeat with
+    the number of repeats that were dropped in between in "suppressed"
+    """
+
+    def __init__(self, window: int = 600):
+        self.window = window
+        self.__events = {}  # (host, information, severity) -> [last uploaded, suppressed repeats, last seen]
+        self.__pending = {}  # state before this upload, restored if it fails
+        self.__last_prune = time.monotonic()
+
+    @staticmethod
+    def from_config():
+        return EventDeduplicator(window=config("EVENT_SUPPRESSION_WINDOW", 600, cast=int))
+
+    def filter_events(self, host, events: list) -> list:
+        """the serialized events of host that are uploaded"""
+        if self.window <= 0:
+            return events
+        now = time.monotonic()
+        output = []
+        for event in events:
+            key = (str(host), event.get("information"), event.get("severity"))
+            state = self.__events.get(key)
+            if key not in self.__pending:
+                self.__pending[key] = None if state is None else list(state)
+            if state is None or now - state[0] >= self.window:
+                if state is not None and state[1]:
+                    event = dict(event, suppressed=state[1])
+                self.__events[key] = [now, 0, now]
+                output.append(event)
+            else:
+                state[1] += 1
+                state[2] = now
+        return output
+
+    def commit(self):
+        """the upload succeeded"""
+        self.__pending = {}
+        now = time.monotonic()
+        if now - self.__last_prune >= self.window:
+            # events that stopped repeating are uploaded as new ones when they come back
+            self.__events = {key: state for key, state in self.__events.items() if now - state[2] < self.window}
+            self.__last_prune = now
+
+    def discard(self):
+        """the upload failed, the events it contained are not suppressed"""
+        for key, state in self.__pending.items():
+            if state is None:
+                self.__events.pop(key, None)
+            else:
+                self.__events[key] = state
+        self.__pending = {}
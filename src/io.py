@@ -52,10 +52,13 @@ class API:
         self._refresh_token = None
         self._url = config("IP")
         self.__counter = 0
+        self.resend_static_data = None  # answer of the backend to the last upload
         self._session.verify = config("SSL_VERIFY", True, cast=bool)
         self._session.trust_env = config("SSL_VERIFY", True, cast=bool)
         self._session.auth = JWTAuth(self)
         self._session.headers['Content-Type'] = 'application/json'
+        if config("CLUSTER_NODE_COUNT", 1, cast=int) > 1:
+            self._session.headers['X-Cluster-Node'] = str(config("CLUSTER_NODE_INDEX", 0, cast=int))
 
     def login(self):
         # generate new token or use old one
@@ -122,6 +125,11 @@ class API:
         # self._logger.error(req.request.body)
         if req.status_code == requests.codes.ok:
             self._logger.info("Data sent successfully.")
+            try:
+                # true for all devices or a list of device ids
+                self.resend_static_data = req.json().get("resend_static_data")
+            except (ValueError, AttributeError):
+                self.resend_static_data = None
             return True
         else:
             self._logger.error(f"Status code: {req.status_code}, response: {req.text}")
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import collections
+import typing
+from src.module_data import LiveData, LiveDataBatch
+
+
+class LiveDataBuffer:
+    """
+    ring buffer of the samples of one (mapping..., name) key until the next upload. once size samples are kept
+    the oldest one is dropped. with aggregations the upload only contains {name}_{aggregation} of the window
+    """
+    __slots__ = ("samples", "aggregations")
+    aggregation_functions = {
+        "min": lambda values: min(values),
+        "max": lambda values: max(values),
+        "avg": lambda values: sum(values) / len(values),
+        "last": lambda values: values[-1]
+    }
+
+    def __init__(self, size: int = None, aggregations: tuple = ()):
+        self.samples = collections.deque(maxlen=size or None)  # (timestamp, value)
+        self.aggregations = aggregations
+
+    @staticmethod
+    def parse_aggregations(aggregations: str) -> tuple:
+        """comma separated aggregation functions, unknown functions are ignored"""
+        return tuple(c_aggregation.strip() for c_aggregation in str(aggregations or "").split(",")
+                     if c_aggregation.strip() in LiveDataBuffer.aggregation_functions)
+
+    def extend(self, other: LiveDataBuffer):
+        # the newer buffer carries the current settings of the module
+        if other.samples.maxlen != self.samples.maxlen:
+            self.samples = collections.deque(self.samples, maxlen=other.samples.maxlen)
+        self.aggregations = other.aggregations
+        self.samples.extend(other.samples)
+
+    def copy(self) -> LiveDataBuffer:
+        buffer = LiveDataBuffer(aggregations=self.aggregations)
+        buffer.samples = collections.deque(self.samples, maxlen=self.samples.maxlen)
+        return buffer
+
+    def serialize(self, name: str) -> list:
+        """(name, {timestamp: value}) to upload"""
+        if not self.aggregations:
+            return [(name, dict(self.samples))]
+        values = [value for _, value in self.samples]
+        timestamp = self.samples[-1][0]  # end of the window
+        return [(f"{name}_{c_aggregation}",
+                 {timestamp: LiveDataBuffer.aggregation_functions[c_aggregation](values)})
+                for c_aggregation in self.aggregations]
+
+    def __getstate__(self):
+        return list(self.samples), self.samples.maxlen, self.aggregations
+
+    def __setstate__(self, state):
+        samples, size, self.aggregations = state
+        self.samples = collections.deque(samples, maxlen=size)
+
+
+class LiveDataStore:
+    """
+    live data of a device by flat (mapping..., name) keys, adding a sample is one dict lookup. the nested
+    {mapping: {...: {name: {timestamp: value}}}} format of the backend is only built by serialize
+    """
+
+    def __init__(self, buffer_size: int = None, aggregations: tuple = ()):
+        self.buffer_size = buffer_size
+        self.aggregations = aggregations
+        self.__samples = {}  # (mapping..., name) -> LiveDataBuffer
+
+    def add(self, name: str, mapping: tuple, timestamp: float, value: float):
+        key = (*mapping, name)
+        samples = self.__samples.get(key)
+        if samples is None:
+            samples = self.__samples[key] = LiveDataBuffer(self.buffer_size, self.aggregations)
+        samples.samples.append((timestamp, value))
+
+    def add_live_data(self, live_data_list: typing.Union[list[LiveData], LiveDataBatch]):
+        if type(live_data_list) is LiveDataBatch:
+            for name, mapping, timestamp, value in live_data_list.samples():
+                self.add(name, mapping, timestamp, value)
+        else:
+            for live_data in live_data_list:
+                self.add(live_data.name, live_data.mapping, live_data.timestamp, live_data.value)
+
+    def update(self, other: LiveDataStore):
+        for key, samples in other.__samples.items():
+            if key in self.__samples:
+                self.__samples[key].extend(samples)
+            else:
+                self.__samples[key] = samples.copy()
+
+    def serialize(self) -> dict:
+        output = {}
+        for key, samples in self.__samples.items():
+            c_output_layer = output
+            for c_part in key[:-1]:
+                c_layer = c_output_layer.get(c_part)
+                if c_layer is None:
+                    c_layer = c_output_layer[c_part] = {}
+                c_output_layer = c_layer
+            for name, values in samples.serialize(key[-1]):
+                c_layer = c_output_layer.get(name)
+                if c_layer is None:
+                    c_output_layer[name] = values
+                else:
+                    c_layer.update(values)
+        return output
+
+    def __len__(self):
+        return sum(len(samples.samples) for samples in self.__samples.values())
+
+    def __bool__(self):
+        return bool(self.__samples)
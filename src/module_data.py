@@ -1,6 +1,8 @@
 from __future__ import annotations
+import sys
 import time
 import json
+from array import array
 from enum import Enum
 import typing
 
@@ -19,6 +21,8 @@ class OutputType(Enum):
 
 
 class LiveData:
+    __slots__ = ("timestamp", "mapping", "name", "value")
+
     def __init__(self, name: str, value: float, mapping: tuple, timestamp: time = None):
         if not timestamp:
             self.timestamp = time.time()
@@ -29,7 +33,57 @@ class LiveData:
         self.value = value
 
 
+class LiveDataBatch:
+    """
+    live data of one module run as columns. every (name, mapping) is stored once, the samples only keep its
+    index, their timestamp and their value in arrays instead of one LiveData object each
+    """
+    __slots__ = ("keys", "key_ids", "timestamps", "values", "__key_index")
+
+    def __init__(self, live_data_list: typing.Iterable[LiveData] = ()):
+        self.keys = []  # (name, mapping)
+        self.key_ids = array("L")
+        self.timestamps = array("d")
+        self.values = array("d")
+        self.__key_index = {}
+        for live_data in live_data_list:
+            self.append(live_data.name, live_data.value, live_data.mapping, live_data.timestamp)
+
+    def append(self, name: str, value: float, mapping: tuple, timestamp: float = None):
+        key = (name, mapping)
+        key_id = self.__key_index.get(key)
+        if key_id is None:
+            key_id = self.__key_index[key] = len(self.keys)
+            self.keys.append((sys.intern(name), tuple(mapping)))
+        self.key_ids.append(key_id)
+        self.timestamps.append(timestamp or time.time())
+        self.values.append(value)
+
+    def samples(self):
+        """(name, mapping, timestamp, value) of every sample"""
+        keys = self.keys
+        for key_id, timestamp, value in zip(self.key_ids, self.timestamps, self.values):
+            name, mapping = keys[key_id]
+            yield name, mapping, timestamp, value
+
+    def __iter__(self):
+        for name, mapping, timestamp, value in self.samples():
+            yield LiveData(name, value, mapping, timestamp)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getstate__(self):
+        return self.keys, self.key_ids, self.timestamps, self.values
+
+    def __setstate__(self, state):
+        self.keys, self.key_ids, self.timestamps, self.values = state
+        self.__key_index = {key: key_id for key_id, key in enumerate(self.keys)}
+
+
 class Event:
+    __slots__ = ("timestamp", "information", "severity")
+
     def __init__(self, information: str, severity: EventSeverity, timestamp: time = time.time()):
         if not timestamp:
             self.timestamp = time.time()
@@ -47,53 +101,17 @@ class Event:
 
 
 class ModuleData:
-    def __init__(self, static_data: dict, live_data: list[LiveData], events: typing.Union[list, dict],
-                 output_type: OutputType = OutputType.DEFAULT):
+    __slots__ = ("static_data", "live_data", "events", "timestamp", "output_type", "watermarks")
+
+    def __init__(self, static_data: dict, live_data: typing.Union[list[LiveData], LiveDataBatch],
+                 events: typing.Union[list, dict], output_type: OutputType = OutputType.DEFAULT,
+                 watermarks: dict = None):
         self.static_data = static_data
         self.live_data = live_data
         self.events = events
         self.timestamp = time.time()
         self.output_type = output_type
-
-    @property
-    def static_data(self):
-        return self.__static_data
-
-    @static_data.setter
-    def static_data(self, static_data):
-        self.__static_data = static_data
-
-    @property
-    def live_data(self):
-        return self.__live_data
-
-    @live_data.setter
-    def live_data(self, live_data):
-        self.__live_data = live_data
-
-    @property
-    def events(self):
-        return self.__events
-
-    @events.setter
-    def events(self, events):
-        self.__events = events
-
-    @property
-    def output_type(self):
-        return self.__output_type
-
-    @output_type.setter
-    def output_type(self, output_type: OutputType):
-        self.__output_type = output_type
-
-    @property
-    def timestamp(self):
-        return self.__timestamp
-
-    @timestamp.setter
-    def timestamp(self, timestamp: float):
-        self.__timestamp = timestamp
+        self.watermarks = watermarks or {}  # zabbix url -> last event of events, persisted after the upload
 
     def __str__(self):
         return json.dumps({"static_data": self.static_data,
@@ -0,0 +1,60 @@
+import time
+import numpy as np
+
+
+class CounterRates:
+    """
+    per second rates of monotonic counters like ifInOctets. the previous sample of every (interface, metric) is
+    kept in arrays, so the rates of all interfaces of a device are computed in a few array operations
+    """
+
+    def __init__(self):
+        self.__keys = []
+        self.__index = {}
+        self.__values = np.zeros(0, dtype=np.uint64)
+        self.__masks = np.zeros(0, dtype=np.uint64)
+        self.__counter64 = None
+        self.__uptime = None
+        self.__timestamp = None
+
+    def update(self, samples: dict, uptime: int = None, counter64: set = frozenset()) -> dict:
+        """
+        samples is {(interface, metric): counter value}, uptime the sysUpTime in ms and counter64 the keys that
+        are 64 bit counters (all others wrap at 2^32). returns {(interface, metric): rate per second} of the keys
+        that also had a sample in the previous call, nothing after a reboot of the device
+        """
+        timestamp = time.monotonic()
+        keys = list(samples)
+        values = np.fromiter((int(value) for value in samples.values()), dtype=np.uint64, count=len(keys))
+        if keys != self.__keys or counter64 != self.__counter64:
+            self.__masks = np.fromiter((0xFFFFFFFFFFFFFFFF if key in counter64 else 0xFFFFFFFF for key in keys),
+                                       dtype=np.uint64, count=len(keys))
+            self.__counter64 = counter64
+        if uptime is not None and self.__uptime is not None:
+            elapsed = (uptime - self.__uptime) / 1000  # time of the device, polling jitter does not skew the rates
+        elif self.__timestamp is not None:
+            elapsed = timestamp - self.__timestamp
+        else:
+            elapsed = 0
+
+        rates = {}
+        # after a reboot sysUpTime went backwards and all counters restarted, only this sample is kept
+        if elapsed > 0 and len(self.__keys):
+            if keys == self.__keys:
+                previous_index = np.arange(len(keys))
+            else:
+                previous_index = np.fromiter((self.__index.get(key, -1) for key in keys), dtype=np.int64,
+                                             count=len(keys))
+            known = previous_index >= 0
+            # unsigned subtraction wraps modulo 2^64, the mask reduces it to modulo 2^32 for 32 bit counters
+            deltas = (values - self.__values[np.where(known, previous_index, 0)]) & self.__masks
+            per_second = deltas.astype(np.float64) / elapsed
+            rates = {keys[c_index]: float(per_second[c_index]) for c_index in np.flatnonzero(known)}
+
+        if keys != self.__keys:
+            self.__keys = keys
+            self.__index = {key: c_index for c_index, key in enumerate(keys)}
+        self.__values = values
+        self.__uptime = uptime
+        self.__timestamp = timestamp
+        return rates
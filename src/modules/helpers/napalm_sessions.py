@@ -0,0 +1,121 @@
+import copy
+import threading
+import time
+import napalm
+from decouple import config
+from src.modules.helpers.s350_ssh_vlan import VlanS350
+from src.utilities import Utilities
+
+
+class NapalmSession:
+    """NAPALM driver of one device that stays open between the cycles of the SSH module"""
+
+    def __init__(self, dev_type: str, dev_creds: dict, keepalive: int = 30):
+        self._logger = Utilities.setup_logger(dev_creds.get("hostname"))
+        self.dev_type = dev_type
+        self.dev_creds = copy.deepcopy(dev_creds)
+        self.keepalive = keepalive
+        self.__conn = None
+        self.__lock = threading.Lock()
+
+    def __is_alive(self):
+        try:
+            return self.__conn.is_alive().get("is_alive", False)
+        except Exception:
+            return False
+
+    def __open(self):
+        # s350 devices need the vlan getter of VlanS350, so the same session serves all getters
+        driver = VlanS350 if self.dev_type == "s350" else napalm.get_network_driver(self.dev_type)
+        dev_creds = copy.deepcopy(self.dev_creds)
+        if self.dev_type == "s350":
+            dev_creds["optional_args"]["keepalive"] = self.keepalive  # SSH keepalive of netmiko
+        conn = driver(**dev_creds)
+        conn.open()
+        self.__conn = conn
+        self._logger.debug(f"opened {self.dev_type} session")
+
+    def __close(self):
+        if self.__conn is not None:
+            try:
+                self.__conn.close()
+            except Exception as ex:
+                self._logger.debug(f"closing the session failed: {ex}")
+            self.__conn = None
+
+    def run(self, func):
+        """
+        calls func with the open driver. the session is opened on first use and reopened once if it broke,
+        either while idle or during func
+        """
+        with self.__lock:
+            opened = False
+            if self.__conn is None or not self.__is_alive():
+                self.__close()
+                self.__open()
+                opened = True
+            try:
+                return func(self.__conn)
+            except Exception as ex:
+                if opened or self.__is_alive():
+                    raise  # not a broken session
+                self._logger.warning(f"{self.dev_type} session broke ({ex}), reconnecting")
+                self.__close()
+                self.__open()
+                return func(self.__conn)
+
+    def send_keepalive(self):
+        """keeps an idle session from running into the exec timeout of the device, skipped while it is in use"""
+        if not self.__lock.acquire(blocking=False):
+            return
+        try:
+            if self.__conn is not None and not self.__is_alive():
+                self.__close()  # reopened on the next use
+        finally:
+            self.__lock.release()
+
+    def close(self):
+        with self.__lock:
+            self.__close()
+
+
+class NapalmSessions:
+    """process wide sessions by hostname, a session is only rebuilt when the device type or credentials change"""
+    __sessions = {}
+    __lock = threading.Lock()
+    __keepalive_thread = None
+
+    @staticmethod
+    def get(dev_type: str, dev_creds: dict) -> NapalmSession:
+        hostname = dev_creds["hostname"]
+        with NapalmSessions.__lock:
+            session = NapalmSessions.__sessions.get(hostname)
+            if session is not None and (session.dev_type != dev_type or session.dev_creds != dev_creds):
+                session.close()
+                session = None
+            keepalive = config("SSH_KEEPALIVE", 30, cast=int)
+            if session is None:
+                session = NapalmSession(dev_type, dev_creds, keepalive)
+                NapalmSessions.__sessions[hostname] = session
+            if NapalmSessions.__keepalive_thread is None and keepalive > 0:
+                NapalmSessions.__keepalive_thread = threading.Thread(target=NapalmSessions.__send_keepalives,
+                                                                     args=(keepalive,), name="sshKeepalive",
+                                                                     daemon=True)
+                NapalmSessions.__keepalive_thread.start()
+            return session
+
+    @staticmethod
+    def close(hostname: str):
+        with NapalmSessions.__lock:
+            session = NapalmSessions.__sessions.pop(hostname, None)
+        if session is not None:
+            session.close()
+
+    @staticmethod
+    def __send_keepalives(interval: int):
+        while True:
+            time.sleep(interval)
+            with NapalmSessions.__lock:
+                sessions = list(NapalmSessions.__sessions.values())
+            for session in sessions:
+                session.send_keepalive()
@@ -7,6 +7,7 @@ import napalm_s350
 
 from src.utilities import Utilities
 import napalm
+import functools
 import re
 from napalm.base.helpers import canonical_interface_name
 import napalm.base.canonical_map
@@ -17,7 +18,10 @@ class Vlan:
         self._logger = Utilities.setup_logger()
         self.dev_creds = dev_creds
 
-    def get_vlan_data(self):
+    def get_vlan_data(self, conn=None):
+        """conn is an open VlanS350 driver to reuse, otherwise a session is opened for this call"""
+        if conn is not None:
+            return Vlan.reformat_vlan_data_to_port_centric_format(conn.get_vlan_data(expand_ports=True))
         conn = VlanS350(**self.dev_creds)
         conn.open()
         vlan_data = conn.get_vlan_data(expand_ports=True)
@@ -27,33 +31,19 @@ class Vlan:
 
     @staticmethod
     def reformat_vlan_data_to_port_centric_format(vlan_data):
-
-        vlans = []
+        ports = {}  # port name -> entry of the output, in order of the first appearance of the port
         for vlan in vlan_data:
-            for tagged_port in vlan["tagged_ports"]:
-
-                port_names = [port["port"] for port in vlans]
-                if tagged_port in port_names:
-                    port_index = port_names.index(tagged_port)
-                    vlans[port_index]["vlans"].append({"id": vlan["id"], "name": vlan["name"]})
-                else:
-                    vlans.append({
-                        "port": tagged_port,
-                        "vlans": [{"id": vlan["id"], "name": vlan["name"]}],
-                        "is_trunk": True
-                    })
-            for untagged_port in vlan["untagged_ports"]:
-                port_names = [port["port"] for port in vlans]
-                if untagged_port in port_names:
-                    port_index = port_names.index(untagged_port)
-                    vlans[port_index]["vlans"].append({"id": vlan["id"], "name": vlan["name"]})
-                else:
-                    vlans.append({
-                        "port": untagged_port,
-                        "vlans": [{"id": vlan["id"], "name": vlan["name"]}],
-                        "is_trunk": False
-                    })
-        return vlans
+            for is_trunk, vlan_ports in ((True, vlan["tagged_ports"]), (False, vlan["untagged_ports"])):
+                for vlan_port in vlan_ports:
+                    if vlan_port in ports:
+                        ports[vlan_port]["vlans"].append({"id": vlan["id"], "name": vlan["name"]})
+                    else:
+                        ports[vlan_port] = {
+                            "port": vlan_port,
+                            "vlans": [{"id": vlan["id"], "name": vlan["name"]}],
+                            "is_trunk": is_trunk
+                        }
+        return list(ports.values())
 
 
 class VlanS350(napalm_s350.S350Driver, ABC):  # napalm.base.NetworkDriver
@@ -64,6 +54,9 @@ class VlanS350(napalm_s350.S350Driver, ABC):  # napalm.base.NetworkDriver
         "te": "TengigabitEthernet",
         "Po": "Link Aggregate ",
     }
+    port_range_regex = re.compile(r"^.+\d+-\d+$")  # e.g. gi1/0/1-12
+    port_range_parts_regex = re.compile(r"^(.*?)(\d+)-(\d+)$")
+    header_end_regex = re.compile(r"^---- -+ .*$")
 
     # [4, 22, 41, 60, 77, 78]
     # 1030      Printer             Po1         gi1/0/14-16,              S
@@ -88,20 +81,18 @@ class VlanS350(napalm_s350.S350Driver, ABC):  # napalm.base.NetworkDriver
 
         return fields_end
 
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def _canonical_name(port):
+        # the same ports show up in many vlans and on every poll
+        return canonical_interface_name(port, VlanS350.s350_base_interfaces)
+
     @staticmethod
     def _expand_ports(port):
-        expanded_ports = []
-        if re.match(r"^.+(\d)+-(\d)+$", port):
-            from_to = re.search(r"(\d)+-(\d)+$", port).group()
-            from_to = from_to.split("-")
-            prefix = re.split(r"(\d)+-(\d)+$", port)[0]
-            for i in range(int(from_to[0]), int(from_to[1]) + 1):
-                expanded_ports.append(prefix + str(i))
-            long_format_ports = []
-            for e_port in expanded_ports:
-                long_format_ports.append(canonical_interface_name(e_port, VlanS350.s350_base_interfaces))
-            return long_format_ports
-        return [canonical_interface_name(port, VlanS350.s350_base_interfaces)]
+        if VlanS350.port_range_regex.match(port):
+            prefix, start, end = VlanS350.port_range_parts_regex.match(port).groups()
+            return [VlanS350._canonical_name(prefix + str(i)) for i in range(int(start), int(end) + 1)]
+        return [VlanS350._canonical_name(port)]
 
     def get_vlan_data(self, expand_ports=True):
         """get_vlan_data implementation for s350"""
@@ -115,7 +106,7 @@ class VlanS350(napalm_s350.S350Driver, ABC):  # napalm.base.NetworkDriver
         for line in output.splitlines():
             if header:
                 # last line of header
-                match = re.match(r"^---- -+ .*$", line)
+                match = VlanS350.header_end_regex.match(line)
                 if match:
                     header = False
                     fields_end = VlanS350._get_vlan_fields_end(line)  # [4, 22, 41, 60, 77, 78]
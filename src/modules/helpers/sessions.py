@@ -0,0 +1,84 @@
+import threading
+from pyzabbix.api import ZabbixAPI, ZabbixAPIException
+from unificontrol import UnifiClient
+
+
+class SharedZabbixAPI(ZabbixAPI):
+    """ZabbixAPI that logs in again when the session expired, once for all threads that use it"""
+    auth_errors = ("re-login", "not authorised", "not authorized")
+
+    def __init__(self, url: str, user: str, password: str):
+        self._user = user
+        self._password = password
+        self._login_lock = threading.Lock()
+        self._generation = 0  # number of logins after the first one
+        super().__init__(url=url, user=user, password=password)
+
+    @staticmethod
+    def is_auth_error(ex: ZabbixAPIException):
+        data = f"{getattr(ex, 'message', '')} {getattr(ex, 'data', '')}".lower()
+        return any(auth_error in data for auth_error in SharedZabbixAPI.auth_errors)
+
+    def do_request(self, method, params=None):
+        generation = self._generation
+        try:
+            return super().do_request(method, params)
+        except ZabbixAPIException as ex:
+            if method == "user.login" or not SharedZabbixAPI.is_auth_error(ex):
+                raise
+            with self._login_lock:
+                if self._generation == generation:  # otherwise another thread already logged in again
+                    self._login(self._user, self._password)
+                    self._generation += 1
+            return super().do_request(method, params)
+
+
+class SharedUnifiClient(UnifiClient):
+    """UnifiClient where concurrent requests that fail with 401 cause one login instead of one per thread"""
+
+    def __init__(self, *args, **kwargs):
+        self.__login_lock = threading.Lock()
+        self.__generation = 0
+        self.__local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def _execute(self, url, method, rest_dict, need_login=True):
+        self.__local.generation = self.__generation  # logins the session had when this request was sent
+        return super()._execute(url, method, rest_dict, need_login)
+
+    def login(self, username=None, password=None):
+        with self.__login_lock:
+            if getattr(self.__local, "generation", None) == self.__generation:
+                super().login(username, password)
+                self.__generation += 1
+
+
+class Sessions:
+    """
+    process wide authenticated clients by (backend, url, user). the client is created (and logged in) once,
+    a new client is only created when the password changed
+    """
+    __sessions = {}  # key -> (password, client)
+    __locks = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get(key: tuple, password: str, factory):
+        with Sessions.__lock:
+            if key not in Sessions.__locks:
+                Sessions.__locks[key] = threading.Lock()
+            lock = Sessions.__locks[key]
+        with lock:  # threads that need the same client wait for its login
+            if key not in Sessions.__sessions or Sessions.__sessions[key][0] != password:
+                Sessions.__sessions[key] = (password, factory())
+            return Sessions.__sessions[key][1]
+
+    @staticmethod
+    def get_zabbix(url: str, user: str, password: str) -> SharedZabbixAPI:
+        return Sessions.get(("zabbix", url, user), password,
+                            lambda: SharedZabbixAPI(url=url, user=user, password=password))
+
+    @staticmethod
+    def get_unifi(host: str, user: str, password: str) -> SharedUnifiClient:
+        return Sessions.get(("unifi", host, user), password,
+                            lambda: SharedUnifiClient(host=host, username=user, password=password))
@@ -1,154 +1,333 @@
-from pysnmp.hlapi import *
+import asyncio
+import itertools
+import random
 import re
+import threading
+import time
 import pysnmp
 import pysnmp.proto
 import pysnmp.proto.rfc1902
+import pysnmp.proto.rfc1905
 import typing
 
+from pysnmp.hlapi import ObjectIdentity
+from pysnmp.proto import api
 from pysnmp.smi import view, builder
+from pyasn1.codec.ber import encoder, decoder
+from pyasn1.type import univ
 
 from src.utilities import Utilities
 
 
-class SNMP:
-    def __init__(self, community_string, hostname, port=161):
+class SnmpRejectedError(Exception):
+    """the agent answered, but with an error-status or a report PDU instead of the requested objects"""
+
+
+class SnmpClientProtocol(asyncio.DatagramProtocol):
+    """UDP endpoint of one SNMP target, responses are matched to the pending requests by their request-id"""
+
+    def __init__(self, proto_module):
+        self.transport = None
+        self.pending = {}
+        self.__proto_module = proto_module
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            message, _ = decoder.decode(data, asn1Spec=self.__proto_module.Message())
+            pdu = self.__proto_module.apiMessage.getPDU(message)
+            future = self.pending.pop(int(self.__proto_module.apiPDU.getRequestID(pdu)), None)
+        except Exception:
+            return  # not a valid SNMP message, the request is retried on timeout
+        if future is not None and not future.done():
+            future.set_result(pdu)
+
+    def error_received(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.pending.clear()
+
+
+class AsyncSNMP:
+    no_value_types = (pysnmp.proto.rfc1905.NoSuchObject, pysnmp.proto.rfc1905.NoSuchInstance,
+                      pysnmp.proto.rfc1905.EndOfMibView)
+    # MIB resolution is the same for every target, names and table columns are resolved once per process
+    __mib_builder = builder.MibBuilder()
+    __mib_view = view.MibViewController(__mib_builder)
+    __mib_lock = threading.Lock()
+    __oids = {}
+    __decoders = {}
+
+    def __init__(self, community_string, hostname, port=161, version="2c", max_repetitions=25, timeout=1,
+                 retries=5):
         self._logger = Utilities.setup_logger()
         self.__community_string = community_string
         self.__hostname = hostname
-        self.__port = port
-        self.__mib_builder = builder.MibBuilder()
-
-    def get_single_value_by_oid(self, oid):
-        iterator = getCmd(
-            SnmpEngine(),
-            CommunityData(self.__community_string, mpModel=0),
-            UdpTransportTarget((self.__hostname, self.__port), timeout=1, retries=5),
-            ContextData(),
-            ObjectType(ObjectIdentity(oid)), lookupMib=True, lexicographicMode=False
-        )
-        (error_indication, error_status, error_index, var_binds) = next(iterator)
-        name, value = var_binds[0]  # name is ObjectName object - value is number object
-        return value.prettyPrint()
-
-    def __get_var_binds_by_name(self, name, mib_name):
-        self._logger.info(f"name: {name} mib-name: {mib_name}")
-        iterator = getCmd(
-            SnmpEngine(),
-            CommunityData(self.__community_string, mpModel=0),
-            UdpTransportTarget((self.__hostname, self.__port), timeout=1, retries=5),  # TODO: add timout and retry everywhere
-            ContextData(),
-            ObjectType(ObjectIdentity(mib_name, name, 0))
-        )
-        (error_indication, error_status, error_index, var_binds) = next(iterator)
-
-        if error_indication:
-            # self._logger.error(error_indication)
-            raise Exception(error_indication)
+        self.__port = int(port)
+        self.__proto_module = api.protoModules[api.protoVersion1 if str(version) == "1" else api.protoVersion2c]
+        self.__use_bulk = str(version) != "1"  # GETBULK does not exist in SNMPv1
+        self.__max_repetitions = int(max_repetitions)
+        self.__timeout = timeout
+        self.__retries = retries
+        # the socket is opened once and reused for every request to this target
+        self.__protocol = None
+        self.__protocol_lock = asyncio.Lock()
+        self.__request_ids = itertools.count(random.randrange(1, 0x7fffffff))
+
+    async def __get_protocol(self) -> SnmpClientProtocol:
+        async with self.__protocol_lock:
+            if self.__protocol is None or self.__protocol.transport.is_closing():
+                _, self.__protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+                    lambda: SnmpClientProtocol(self.__proto_module), remote_addr=(self.__hostname, self.__port))
+            return self.__protocol
+
+    def close(self):
+        if self.__protocol is not None:
+            self.__protocol.transport.close()
+            self.__protocol = None
+
+    async def __request(self, pdu):
+        p_mod = self.__proto_module
+        protocol = await self.__get_protocol()
+        request_id = next(self.__request_ids) % 0x7fffffff + 1
+        p_mod.apiPDU.setRequestID(pdu, request_id)
+        message = p_mod.Message()
+        p_mod.apiMessage.setDefaults(message)
+        p_mod.apiMessage.setCommunity(message, self.__community_string)
+        p_mod.apiMessage.setPDU(message, pdu)
+        data = encoder.encode(message)
+
+        future = asyncio.get_running_loop().create_future()
+        protocol.pending[request_id] = future
+        try:
+            for _ in range(self.__retries + 1):
+                protocol.transport.sendto(data)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), self.__timeout)
+                except asyncio.TimeoutError:
+                    continue
+            raise Exception(f"No SNMP response received before timeout from {self.__hostname}")
+        finally:
+            protocol.pending.pop(request_id, None)
+            future.cancel()
+
+    def __create_pdu(self, pdu, oids: list):
+        self.__proto_module.apiPDU.setDefaults(pdu)
+        self.__proto_module.apiPDU.setVarBinds(pdu, [(oid, self.__proto_module.Null('')) for oid in oids])
+        return pdu
+
+    def __get_error(self, response, oids: list):
+        """(error status name, index of the failed object) or (None, None)"""
+        error_status = self.__proto_module.apiPDU.getErrorStatus(response)
+        if not error_status:
+            return None, None
+        error_index = int(self.__proto_module.apiPDU.getErrorIndex(response))
+        if 0 < error_index <= len(oids):
+            return error_status.prettyPrint(), error_index - 1
+        return error_status.prettyPrint(), None
+
+    @staticmethod
+    def resolve(mib_name, name, *indices):
+        with AsyncSNMP.__mib_lock:
+            if (mib_name, name, indices) not in AsyncSNMP.__oids:
+                object_identity = ObjectIdentity(mib_name, name, *indices).resolveWithMib(AsyncSNMP.__mib_view)
+                AsyncSNMP.__oids[(mib_name, name, indices)] = object_identity.getOid()
+            return AsyncSNMP.__oids[(mib_name, name, indices)]
+
+    async def __get_scalar_values(self, oids: list) -> list:
+        """
+        GET of many scalars in one PDU. the request is split when the agent answers tooBig,
+        objects the agent does not know are returned as None
+        """
+        if not oids:
+            return []
+        response = await self.__request(self.__create_pdu(self.__proto_module.GetRequestPDU(), oids))
+        error_status, index = self.__get_error(response, oids)
+        if error_status == 'tooBig' and len(oids) > 1:
+            middle = len(oids) // 2
+            return await self.__get_scalar_values(oids[:middle]) + await self.__get_scalar_values(oids[middle:])
+        elif error_status == 'noSuchName' and index is not None:  # SNMPv1 rejects the whole PDU for one unknown object
+            values = await self.__get_scalar_values(oids[:index] + oids[index + 1:])
+            return values[:index] + [None] + values[index:]
         elif error_status:
-            # self._logger.error('%s at %s' % (error_status.prettyPrint(),
-            #                                  error_index and var_binds[int(error_index) - 1][0] or '?'))
-            raise Exception('%s at %s' % (error_status.prettyPrint(),
-                                          error_index and var_binds[int(error_index) - 1][0] or '?'))
-        else:
-            if var_binds:
-                return var_binds
-            else:
-                raise Exception(f"no value returned for {name} in MIB: {mib_name}")
-
-    def get_single_value_by_name(self, name, mib_name='SNMPv2-MIB'):
-        name, value = self.__get_var_binds_by_name(name, mib_name)[0]  # name is ObjectName object - value is number object
+            raise SnmpRejectedError('%s at %s' % (error_status, oids[index] if index is not None else '?'))
+        values = []
+        for oid, value in self.__proto_module.apiPDU.getVarBinds(response):
+            values.append(None if isinstance(value, AsyncSNMP.no_value_types) else value)
+        return values
+
+    async def get_single_value_by_oid(self, oid):
+        value, = await self.__get_scalar_values([univ.ObjectIdentifier(oid)])
+        if value is None:
+            raise Exception(f"no value returned for {oid}")
         return value.prettyPrint()
 
-    def get_single_value_by_name_with_name(self, name, mib_name='SNMPv2-MIB'):
-        oid, value = self.__get_var_binds_by_name(name, mib_name)[0]  # name is ObjectName object - value is number object
-        #_, name, index = oid.getMibSymbol()  # _ is MIB name
-        value = value.prettyPrint()
-        #return {name: value}
-        return value
-
-    def get_table(self, arguments_list: list, mib_name):
-        _var_binds = []
-
-        for key in arguments_list:
-            _var_binds.append(ObjectType(ObjectIdentity(mib_name, key)))
-
-        iterator = nextCmd(
-            SnmpEngine(),
-            CommunityData(self.__community_string),
-            UdpTransportTarget((self.__hostname, 161), timeout=1, retries=5),
-            ContextData(),
-            *_var_binds,
-            lexicographicMode=False,
-            lookupMib=True
-        )
+    async def get_single_value_by_name(self, name, mib_name='SNMPv2-MIB'):
+        value, = await self.__get_scalar_values([AsyncSNMP.resolve(mib_name, name, 0)])
+        if value is None:
+            raise Exception(f"no value returned for {name} in MIB: {mib_name}")
+        return value.prettyPrint()
 
+    async def get_values_by_names(self, names: list, mib_name='SNMPv2-MIB') -> dict:
+        """batched get_single_value_by_name: {name: value}, value is None if the agent has no such object"""
+        return await self.get_values([(mib_name, name) for name in names])
+
+    async def get_values(self, objects: list) -> dict:
+        """get_values_by_names for scalars of several MIBs, objects is a list of (mib_name, name)"""
+        values = await self.__get_scalar_values([AsyncSNMP.resolve(mib_name, name, 0) for mib_name, name in objects])
+        return {name: value.prettyPrint() if value is not None else None
+                for (_, name), value in zip(objects, values)}
+
+    @staticmethod
+    def __create_converter(syntax):
+        """converts a raw value of a column to its native type without going through prettyPrint and int()"""
+        if isinstance(syntax, pysnmp.proto.rfc1902.TimeTicks):
+            return lambda value: int(value) * 10
+        if isinstance(syntax, univ.Integer):  # Integer32, Counter32/64, Gauge32, Unsigned32 and enums
+            labels = {int(number): label for label, number in syntax.namedValues.items()}
+            if labels:
+                return lambda value: labels.get(int(value), int(value))
+            return int
+        if getattr(syntax, "displayHint", None):  # textual conventions like PhysAddress or DisplayString
+            return lambda value: syntax.clone(value).prettyPrint()
+        return lambda value: value.prettyPrint()
+
+    @staticmethod
+    def get_column_decoder(mib_name, column):
+        """(column OID, column name, converter), resolved from the MIB once per process"""
+        column_oid = AsyncSNMP.resolve(mib_name, column)
+        with AsyncSNMP.__mib_lock:
+            if column_oid not in AsyncSNMP.__decoders:
+                mib_node, = AsyncSNMP.__mib_builder.importSymbols(mib_name, column)
+                AsyncSNMP.__decoders[column_oid] = (column, AsyncSNMP.__create_converter(mib_node.syntax))
+            name, converter = AsyncSNMP.__decoders[column_oid]
+            return column_oid, name, converter
+
+    async def get_table(self, arguments_list: list, mib_name, index_name: str = None):
+        """rows of the given columns, index_name adds the (first component of the) row index to every row"""
+        decoders = [AsyncSNMP.get_column_decoder(mib_name, key) for key in arguments_list]
+
+        if self.__use_bulk:
+            try:
+                return await self.__walk(decoders, bulk=True, index_name=index_name)
+            except SnmpRejectedError as ex:
+                # timeouts are raised, the next poll tries GETBULK again
+                all_data = await self.__walk(decoders, bulk=False, index_name=index_name)
+                # only switch to GETNEXT if the agent answers those
+                self._logger.warning(f"{self.__hostname} rejected GETBULK ({ex}), falling back to GETNEXT")
+                self.__use_bulk = False
+                return all_data
+        return await self.__walk(decoders, bulk=False, index_name=index_name)
+
+    async def __walk(self, decoders: list, bulk: bool, index_name: str = None):
+        columns = [column_oid for column_oid, _, _ in decoders]
+        last_oids = list(columns)
+        active = list(range(len(columns)))  # columns that are not walked to their end yet
+        max_repetitions = self.__max_repetitions
         all_data = []
-        for error_indication, error_status, error_index, var_binds in iterator:
-            if error_indication:
-                # self._logger.error(error_indication)
-                # break
-                raise Exception(error_indication)
-                # TODO: previously break - how can no variables found appear on no exception???
-            elif error_status:
-                # self._logger.error('%s at %s' % (error_status.prettyPrint(),
-                #                                  error_index and var_binds[int(error_index) - 1][0] or '?'))
-                # break
-                raise Exception('%s at %s' % (error_status.prettyPrint(),
-                                              error_index and var_binds[int(error_index) - 1][0] or '?'))
-                # TODO: here too - break
+        while active:
+            oids = [last_oids[c_column] for c_column in active]
+            if bulk:
+                pdu = self.__create_pdu(self.__proto_module.GetBulkRequestPDU(), oids)
+                self.__proto_module.apiBulkPDU.setNonRepeaters(pdu, 0)
+                self.__proto_module.apiBulkPDU.setMaxRepetitions(pdu, max_repetitions)
             else:
-                if var_binds:
-                    parse_exceptions = ["up", "down", "notPresent"]
-                    entity_data = {}
-                    for var_bind in var_binds:
-                        oid, value = var_bind
-                        mib, name, index = oid.getMibSymbol()
-
-                        mib_node, = self.__mib_builder.importSymbols(mib, name)
-                        value = value.prettyPrint()
-                        # index = index[0].prettyPrint()
-                        if value == 'No more variables left in this MIB View':
-                            continue
-                        #self._logger.error(type(mib_node.syntax))
-                        #if isinstance(mib_node.syntax, typing.Union[pysnmp.proto.rfc1902.TimeTicks, pysnmp.proto.rfc1902.Integer32, pysnmp.proto.rfc1902.Counter32, pysnmp.proto.rfc1902.Gauge32].__args__):
-                        if mib_node.syntax.__class__ == pysnmp.proto.rfc1902.TimeTicks:
-                            entity_data[name] = int(value) * 10
-                        for c in [pysnmp.proto.rfc1902.Integer32, pysnmp.proto.rfc1902.Counter32, pysnmp.proto.rfc1902.Gauge32]:
-                            if mib_node.syntax.__class__ == c:
-                                if value in parse_exceptions:
-                                    entity_data[name] = value
-                                else:
-                                    entity_data[name] = int(value)
-                                break
-                        else:
-                            entity_data[name] = value
-
-                            # try:
-                            #     if value in parse_exceptions:
-                            #         entity_data[name] = value
-                            #     else:
-                            #         if isinstance(mib_node.syntax, pysnmp.proto.rfc1902.TimeTicks):
-                            #             entity_data[name] = int(value)*10
-                            #         else:
-                            #             entity_data[name] = int(value)
-                            # except Exception:
-                            #     self._logger.error(f"{mib_node.syntax.__class__=}, {value=}")
-                        # else:
-                        #     entity_data[name] = value
+                pdu = self.__create_pdu(self.__proto_module.GetNextRequestPDU(), oids)
+            response = await self.__request(pdu)
+            if response.tagSet != self.__proto_module.GetResponsePDU.tagSet:
+                raise SnmpRejectedError(f"{response.__class__.__name__} at {oids[0]}")
+            error_status, index = self.__get_error(response, oids)
+            if error_status == 'tooBig' and bulk and max_repetitions > 1:
+                max_repetitions //= 2
+                continue
+            elif error_status == 'noSuchName' and index is not None:  # SNMPv1 end of the MIB view
+                active.pop(index)
+                continue
+            elif error_status:
+                raise SnmpRejectedError('%s at %s' % (error_status, oids[index] if index is not None else '?'))
+
+            var_binds = self.__proto_module.apiPDU.getVarBinds(response)
+            if not var_binds:
+                self._logger.warning("no value returned")
+                break
+            still_active = set(active)
+            for row_start in range(0, len(var_binds), len(active)):
+                entity_data = {}
+                for c_column, (oid, value) in zip(active, var_binds[row_start:row_start + len(active)]):
+                    if c_column not in still_active:
+                        continue
+                    if isinstance(value, AsyncSNMP.no_value_types) or not columns[c_column].isPrefixOf(oid) \
+                            or oid <= last_oids[c_column]:
+                        still_active.discard(c_column)  # this column is walked to its end
+                        continue
+                    last_oids[c_column] = oid
+                    if index_name is not None and index_name not in entity_data:
+                        entity_data[index_name] = int(oid[len(columns[c_column])])
+                    _, name, converter = decoders[c_column]
+                    try:
+                        entity_data[name] = converter(value)
+                    except Exception:
+                        entity_data[name] = value.prettyPrint()
+                if entity_data:
                     all_data.append(entity_data)
-                else:
-                    self._logger.warning("no value returned")
+            active = [c_column for c_column in active if c_column in still_active]
         self._logger.debug(all_data)
         return all_data
 
 
-class DataSources:
-    def __init__(self, snmp: SNMP):
+class SNMP:
+    """blocking API of AsyncSNMP, the requests of one target run on a private event loop"""
+
+    def __init__(self, community_string, hostname, port=161, version="2c", max_repetitions=25):
+        self._logger = Utilities.setup_logger()
+        self.async_snmp = AsyncSNMP(community_string, hostname, port, version, max_repetitions)
+        self.__loop = None
+
+    def run(self, coroutine):
+        if self.__loop is None or self.__loop.is_closed():
+            self.__loop = asyncio.new_event_loop()
+        return self.__loop.run_until_complete(coroutine)
+
+    def close(self):
+        self.async_snmp.close()
+        if self.__loop is not None and not self.__loop.is_closed():
+            self.__loop.run_until_complete(asyncio.sleep(0))  # let the transport finish closing
+            self.__loop.close()
+
+    def get_single_value_by_oid(self, oid):
+        return self.run(self.async_snmp.get_single_value_by_oid(oid))
+
+    def get_single_value_by_name(self, name, mib_name='SNMPv2-MIB'):
+        return self.run(self.async_snmp.get_single_value_by_name(name, mib_name))
+
+    def get_single_value_by_name_with_name(self, name, mib_name='SNMPv2-MIB'):
+        return self.get_single_value_by_name(name, mib_name)
+
+    def get_values_by_names(self, names: list, mib_name='SNMPv2-MIB') -> dict:
+        return self.run(self.async_snmp.get_values_by_names(names, mib_name))
+
+    def get_table(self, arguments_list: list, mib_name, index_name: str = None):
+        return self.run(self.async_snmp.get_table(arguments_list, mib_name, index_name))
+
+
+class AsyncDataSources:
+    def __init__(self, snmp: AsyncSNMP, static_interval: int = 3600):
         self.__snmp = snmp
         self._logger = Utilities.setup_logger()
+        # static interface columns are only walked every static_interval seconds or when the device reports a change
+        self.static_interval = static_interval
+        self.__static_interfaces = {}  # ifIndex -> static columns of the last full walk
+        self.__static_walked = None
+        self.__uptime = None
+        self.__table_last_change = None
+        self.__hc_supported = None  # whether the device has the 64 bit octet counters of the ifXTable
+        self.counter64 = set()  # (interface, metric) of the last get_interfaces that are 64 bit counters
 
 
-    def get_system_data(self):
+    async def get_system_data(self):
         system_data = {}
         # keys = [
         #     "sysName",
@@ -159,17 +338,18 @@ class DataSources:
         #     "sysLocation"
         # ]
 
-        system_data["name"] = self.__snmp.get_single_value_by_name_with_name("sysName")
-        system_data["uptime"] = int(self.__snmp.get_single_value_by_name_with_name("sysUpTime")) * 10
-        system_data["description"] = self.__snmp.get_single_value_by_name_with_name("sysDescr")
-        system_data["contact"] = self.__snmp.get_single_value_by_name_with_name("sysContact")
-        system_data["location"] = self.__snmp.get_single_value_by_name_with_name("sysLocation")
+        values = await self.__snmp.get_values_by_names(["sysName", "sysUpTime", "sysDescr", "sysContact", "sysLocation"])
+        system_data["name"] = values["sysName"]
+        system_data["uptime"] = int(values["sysUpTime"]) * 10
+        system_data["description"] = values["sysDescr"]
+        system_data["contact"] = values["sysContact"]
+        system_data["location"] = values["sysLocation"]
 
         # for key in keys:
         #     system_data.update(self.__snmp.get_single_value_by_name_with_name(key))
         return {"system": system_data}
 
-    def get_ip_data(self):
+    async def get_ip_data(self):
         ip_data = {}
         # keys = [
         #     "ipForwarding",
@@ -194,33 +374,37 @@ class DataSources:
         #     "ipRoutingDiscards"
         # ]
 
-        ip_data["forwarding"] = self.__snmp.get_single_value_by_name_with_name("ipForwarding")  # TODO: check for value (int / bool can forward / is router or only host)
-        ip_data["default_ttl"] = self.__snmp.get_single_value_by_name_with_name("ipDefaultTTL")
-        ip_data["in_receives"] = self.__snmp.get_single_value_by_name_with_name("ipInReceives")
-        ip_data["in_hdr_errors"] = self.__snmp.get_single_value_by_name_with_name("ipInHdrErrors")
-        ip_data["in_addr_errors"] = self.__snmp.get_single_value_by_name_with_name("ipInAddrErrors")
-        ip_data["forward_datagrams"] = self.__snmp.get_single_value_by_name_with_name("ipForwDatagrams")
-        ip_data["in_unknown_protocol"] = self.__snmp.get_single_value_by_name_with_name("ipInUnknownProtos")
-        ip_data["in_discards"] = self.__snmp.get_single_value_by_name_with_name("ipInDiscards")
-        ip_data["in_delivers"] = self.__snmp.get_single_value_by_name_with_name("ipInDelivers")
-        ip_data["out_requests"] = self.__snmp.get_single_value_by_name_with_name("ipOutRequests")
-        ip_data["out_discards"] = self.__snmp.get_single_value_by_name_with_name("ipOutDiscards")
-        ip_data["out_no_routes"] = self.__snmp.get_single_value_by_name_with_name("ipOutNoRoutes")
-        ip_data["reasm_timeout"] = self.__snmp.get_single_value_by_name_with_name("ipReasmTimeout")
-        # ip_data["reasm_ok"] = self.__snmp.get_single_value_by_name_with_name("ipReasmOKs")  # deprecated
-        # ip_data["reasm_fails"] = self.__snmp.get_single_value_by_name_with_name("ipReasmFails")  # deprecated
-        # ip_data["fragments_ok"] = self.__snmp.get_single_value_by_name_with_name("ipFragOKs")  # deprecated
-        # ip_data["fragments_fails"] = self.__snmp.get_single_value_by_name_with_name("ipFragFails")  # deprecated
-        # ip_data["fragments_creates"] = self.__snmp.get_single_value_by_name_with_name("ipFragCreates")  # deprecated
-        ip_data["routing_discards"] = self.__snmp.get_single_value_by_name_with_name("ipRoutingDiscards")
-
+        canonical_names = {
+            "ipForwarding": "forwarding",  # TODO: check for value (int / bool can forward / is router or only host)
+            "ipDefaultTTL": "default_ttl",
+            "ipInReceives": "in_receives",
+            "ipInHdrErrors": "in_hdr_errors",
+            "ipInAddrErrors": "in_addr_errors",
+            "ipForwDatagrams": "forward_datagrams",
+            "ipInUnknownProtos": "in_unknown_protocol",
+            "ipInDiscards": "in_discards",
+            "ipInDelivers": "in_delivers",
+            "ipOutRequests": "out_requests",
+            "ipOutDiscards": "out_discards",
+            "ipOutNoRoutes": "out_no_routes",
+            "ipReasmTimeout": "reasm_timeout",
+            # "ipReasmOKs": "reasm_ok",  # deprecated
+            # "ipReasmFails": "reasm_fails",  # deprecated
+            # "ipFragOKs": "fragments_ok",  # deprecated
+            # "ipFragFails": "fragments_fails",  # deprecated
+            # "ipFragCreates": "fragments_creates",  # deprecated
+            "ipRoutingDiscards": "routing_discards"
+        }
+        values = await self.__snmp.get_values_by_names(list(canonical_names.keys()), "IP-MIB")
+        for name, canonical_name in canonical_names.items():
+            ip_data[canonical_name] = values[name]
 
         # for key in keys:
         #     ip_data.update(self.__snmp.get_single_value_by_name_with_name(key, "IP-MIB"))
         return {"ip": ip_data}
 
-    def get_services(self):
-        services_key = int(self.__snmp.get_single_value_by_name('sysServices'))  # https://oidref.com/1.3.6.1.2.1.1.7
+    async def get_services(self):
+        services_key = int((await self.__snmp.get_values_by_names(['sysServices']))['sysServices'])  # https://oidref.com/1.3.6.1.2.1.1.7
         services = {}  # services by OSI layers
 
         services["ApplicationLayer"] = services_key >= 64
@@ -247,7 +431,48 @@ class DataSources:
 
         return {"services": services}
 
-    def get_interfaces(self):  # 1.3.6.1.2.1.2.2.1
+    def __static_interfaces_changed(self, uptime, table_last_change) -> bool:
+        if self.__static_walked is None or time.monotonic() - self.__static_walked >= self.static_interval:
+            return True
+        if uptime is not None and self.__uptime is not None and int(uptime) < int(self.__uptime):
+            return True  # sysUpTime reset, the device rebooted
+        return table_last_change != self.__table_last_change
+
+    async def __get_interface_rows(self, keys: list, live_keys: list) -> list:
+        """
+        rows of the IF-MIB ifTable. the counters are walked every time, the static columns are reused from
+        the last full walk unless it is older than static_interval, the device rebooted or interfaces changed
+        """
+        scalars = await self.__snmp.get_values([("SNMPv2-MIB", "sysUpTime"), ("IF-MIB", "ifTableLastChange")])
+        uptime, table_last_change = scalars["sysUpTime"], scalars["ifTableLastChange"]
+        if not self.__static_interfaces_changed(uptime, table_last_change):
+            live_rows = await self.__snmp.get_table(["ifIndex", "ifLastChange"] + live_keys, "IF-MIB")
+            # otherwise interfaces were added or removed or one of them changed its state
+            if len(live_rows) == len(self.__static_interfaces) and all(
+                    row.get("ifIndex") in self.__static_interfaces and
+                    row.get("ifLastChange") == self.__static_interfaces[row["ifIndex"]].get("ifLastChange")
+                    for row in live_rows):
+                self.__uptime = uptime
+                return [{**self.__static_interfaces[row["ifIndex"]], **row} for row in live_rows]
+
+        rows = await self.__snmp.get_table(keys, "IF-MIB")
+        self.__static_interfaces = {row.get("ifIndex"): {key: value for key, value in row.items()
+                                                         if key not in live_keys} for row in rows}
+        self.__static_walked = time.monotonic()
+        self.__uptime = uptime
+        self.__table_last_change = table_last_change
+        self.__hc_supported = None
+        return rows
+
+    async def __get_hc_octets(self) -> dict:
+        """ifHCInOctets/ifHCOutOctets by ifIndex, empty if the device has no ifXTable"""
+        if self.__hc_supported is False:
+            return {}
+        rows = await self.__snmp.get_table(["ifHCInOctets", "ifHCOutOctets"], "IF-MIB", index_name="ifIndex")
+        self.__hc_supported = bool(rows)
+        return {row["ifIndex"]: row for row in rows}
+
+    async def get_interfaces(self):  # 1.3.6.1.2.1.2.2.1
         _keys = [
             'ifIndex',
             'ifDescr',
@@ -308,10 +533,17 @@ class DataSources:
             'ifOutErrors': 'out_errors'
         }
 
-        old_name_values = self.__snmp.get_table(_keys, "IF-MIB")
+        old_name_values = await self.__get_interface_rows(_keys, _live_keys)
+        hc_octets = await self.__get_hc_octets()
+        self.counter64 = set()
         static_values = {}
         live_values = {}
         for val in old_name_values:
+            if val.get("ifIndex") in hc_octets:
+                # the 32 bit counters wrap within seconds on fast links
+                hc_row = hc_octets[val["ifIndex"]]
+                val = {**val, "ifInOctets": hc_row.get("ifHCInOctets", val.get("ifInOctets")),
+                       "ifOutOctets": hc_row.get("ifHCOutOctets", val.get("ifOutOctets"))}
             infos = {}
             # ^[a-zA-Z]*[0-9]*(/[0-9]*)*
             if re.match(r"^[a-zA-Z]+[0-9]+(/[0-9]+){1,2}$", val["ifDescr"]):
@@ -342,13 +574,18 @@ class DataSources:
 
                 static_values[key] = {}
                 live_values[key] = {}
+                if val.get("ifIndex") in hc_octets:
+                    self.counter64.update({(key, "in_bytes"), (key, "out_bytes")})
                 for _key in _keys:
                     if _key in val:
+                        # the counters change on every poll, they are only sent as live data rates
                         if _key in _live_keys:
                             live_values[key].update({canonical_names[_key]: val[_key]})
-                            static_values[key].update({canonical_names[_key]: val[_key]})  # TODO: remove
                         else:
                             static_values[key].update({canonical_names[_key]: val[_key]})
+                # ifIndex is decoded as int for the lookups above, the backend gets its display string as before
+                if "index" in static_values[key]:
+                    static_values[key]["index"] = str(static_values[key]["index"])
 
 
                 # new_values[key] = {
@@ -392,7 +629,7 @@ class DataSources:
 
         return static_values, live_values
 
-    def get_ip_addresses(self):
+    async def get_ip_addresses(self):
         _keys = [
             'ipAdEntAddr',
             'ipAdEntIfIndex',
@@ -401,7 +638,7 @@ class DataSources:
             # 'ipAdEntReasmMaxSize'
         ]
 
-        old_name_values = self.__snmp.get_table(_keys, "IP-MIB")
+        old_name_values = await self.__snmp.get_table(_keys, "IP-MIB")
         new_values = {}
         for val in old_name_values:
             if not val["ipAdEntAddr"] == "127.0.0.1":
@@ -415,3 +652,26 @@ class DataSources:
         self._logger.warning(str({"ipAddresses": new_values}))
 
         return {"ipAddresses": new_values}
+
+
+class DataSources:
+    """blocking API of AsyncDataSources"""
+
+    def __init__(self, snmp: SNMP, static_interval: int = 3600):
+        self.__snmp = snmp
+        self.async_data_sources = AsyncDataSources(snmp.async_snmp, static_interval)
+
+    def get_system_data(self):
+        return self.__snmp.run(self.async_data_sources.get_system_data())
+
+    def get_ip_data(self):
+        return self.__snmp.run(self.async_data_sources.get_ip_data())
+
+    def get_services(self):
+        return self.__snmp.run(self.async_data_sources.get_services())
+
+    def get_interfaces(self):
+        return self.__snmp.run(self.async_data_sources.get_interfaces())
+
+    def get_ip_addresses(self):
+        return self.__snmp.run(self.async_data_sources.get_ip_addresses())
@@ -0,0 +1,48 @@
+import threading
+import time
+from decouple import config
+
+
+class UnifiSnapshot:
+    """inventory of one controller as fetched at one point in time"""
+
+    def __init__(self, devices: list, clients: list, port_conf: list, networks: list):
+        self.devices = devices
+        self.clients = clients
+        self.port_conf = port_conf
+        self.networks = networks
+        self.fetched = time.monotonic()
+        self.devices_by_ip = {device.get("ip"): device for device in devices}
+        self.devices_by_mac = {device.get("mac"): device for device in devices}
+        # the builders look up every port and lldp neighbor, these indexes are built once per download
+        self.clients_by_mac = {}
+        for client in clients:
+            self.clients_by_mac.setdefault(client.get("mac"), []).append(client)
+        self.port_conf_by_id = {port_conf_obj.get("_id"): port_conf_obj for port_conf_obj in port_conf}
+        self.networks_by_id = {network_obj.get("_id"): network_obj for network_obj in networks}
+
+
+class UnifiCache:
+    """
+    process wide inventory by controller hostname. all modules of a controller share one download per
+    UNIFI_CACHE_TTL seconds, concurrent requests wait for the download that is already running
+    """
+    __snapshots = {}
+    __locks = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get(hostname: str, connection) -> UnifiSnapshot:
+        ttl = config("UNIFI_CACHE_TTL", 60, cast=int)
+        with UnifiCache.__lock:
+            if hostname not in UnifiCache.__locks:
+                UnifiCache.__locks[hostname] = threading.Lock()
+            lock = UnifiCache.__locks[hostname]
+        with lock:
+            snapshot = UnifiCache.__snapshots.get(hostname)
+            if snapshot is None or time.monotonic() - snapshot.fetched >= ttl:
+                snapshot = UnifiSnapshot(connection.list_devices(), connection.list_clients(),
+                                         connection.list_portconf(), connection.list_networkconf())
+                UnifiCache.__snapshots[hostname] = snapshot
+            return snapshot
+
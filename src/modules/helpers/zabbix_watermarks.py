@@ -0,0 +1,53 @@
+import json
+import os
+import re
+import threading
+from decouple import config
+
+
+class ZabbixWatermarks:
+    """
+    last uploaded event ({"eventid": str, "clock": int}) by zabbix server url. every server has its own json file
+    in ZABBIX_WATERMARK_DIR so the events module continues where it stopped after a restart
+    """
+    __watermarks = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def __file(url: str):
+        directory = config("ZABBIX_WATERMARK_DIR", "./zabbix_watermarks", cast=str)
+        if not directory:
+            return None
+        return os.path.join(directory, f"{re.sub(r'[^A-Za-z0-9.-]', '_', url)}.json")
+
+    @staticmethod
+    def get(url: str, logger):
+        with ZabbixWatermarks.__lock:
+            watermark = ZabbixWatermarks.__watermarks.get(url)
+            # read on every call, in sharded mode the devicehandler persists the watermarks in another process
+            file_name = ZabbixWatermarks.__file(url)
+            if file_name is not None and os.path.exists(file_name):
+                try:
+                    with open(file_name) as file:
+                        persisted = json.load(file)
+                    persisted = {"eventid": str(persisted["eventid"]), "clock": int(persisted["clock"])}
+                    if watermark is None or int(persisted["eventid"]) > int(watermark["eventid"]):
+                        watermark = persisted
+                except (OSError, ValueError, KeyError, TypeError) as ex:
+                    logger.warning(f"ignoring the watermark in {file_name}: {ex}")
+            return watermark
+
+    @staticmethod
+    def set(url: str, watermark: dict, logger):
+        with ZabbixWatermarks.__lock:
+            ZabbixWatermarks.__watermarks[url] = watermark
+            file_name = ZabbixWatermarks.__file(url)
+            if file_name is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(file_name), exist_ok=True)
+                with open(f"{file_name}.tmp", "w") as file:
+                    json.dump(watermark, file)
+                os.replace(f"{file_name}.tmp", file_name)  # a crash never leaves a half written watermark
+            except OSError as ex:
+                logger.warning(f"could not persist the watermark of {url}: {ex}")
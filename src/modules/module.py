@@ -1,22 +1,27 @@
+import asyncio
 import datetime
 import json
 import threading
 import time
 from src.module_data import ModuleData
 from src.device_data import DeviceData
+from src.live_data_store import LiveDataBuffer
 from src.settings import Settings, SettingsItem, SettingsItemType
 from src.utilities import Utilities
+from src.worker_pools import WorkerPools
 
 
 class Module(threading.Thread):
+    family = "default"  # worker pool the worker of this module runs in
+
     def __init__(self, ip: str, timeout: int, config: dict, *args, **kwargs):
         self._logger = Utilities.setup_logger(ip)
-        self.__data = DeviceData()
         self.timeout = timeout
         self.ip = ip
         self.config_signature, self.default_config = self.__class__.config_template().serialize()
         # print(self.default_config)
         self.config = config
+        self.__data = self.__create_device_data()
         self.last_updated = datetime.datetime.now()
         super().__init__(*args, **kwargs)
         self.__is_running = True
@@ -67,23 +72,60 @@ class Module(threading.Thread):
 
     def clear_data(self):
         self.last_updated = datetime.datetime.now()
-        self.__data = DeviceData()
+        self.__data = self.__create_device_data()
+
+    def __create_device_data(self):
+        # the live data of every metric is kept in a ring buffer of this size until the device uploads it
+        buffer_size = int(self.get_config_value("live_data_buffer_size") or 360)
+        aggregations = LiveDataBuffer.parse_aggregations(self.get_config_value("live_data_aggregation"))
+        return DeviceData(buffer_size, aggregations)
 
     @staticmethod
     def config_template():
         settings = Settings()
         return settings
 
+    def get_timeout(self):
+        if self.get_config_value("timeout"):
+            return int(self.get_config_value("timeout"))
+        return self.timeout
+
+    def check_last_updated(self):
+        c_timeout = self.get_timeout()
+        if (datetime.datetime.now() - self.last_updated) > datetime.timedelta(seconds=c_timeout*2):
+            self.stop()
+
+    def poll(self):
+        self.check_last_updated()
+        self.data = self.worker()
+
+    async def poll_async(self):
+        """poll on the event loop of the asyncio runtime, modules with a non blocking worker override this"""
+        # worker implementations are blocking
+        await asyncio.wrap_future(WorkerPools.get(self.family).submit(self.poll))
+
+    def close(self):
+        """called once the module stopped, releases sockets and sessions of the worker"""
+        pass
+
     def run(self):
         while self.is_running():
-            if self.get_config_value("timeout"):
-                c_timeout = self.get_config_value("timeout")
-            else:
-                c_timeout = self.timeout
-            if (datetime.datetime.now() - self.last_updated) > datetime.timedelta(seconds=c_timeout*2):
-                self.stop()
-            self.data = self.worker()
-            time.sleep(int(c_timeout))
+            WorkerPools.get(self.family).submit(self.poll).result()
+            time.sleep(self.get_timeout())
+        self.close()
+
+    async def run_async(self, runtime):
+        while self.is_running():
+            await self.poll_async()
+            await asyncio.sleep(self.get_timeout())
+        self.close()
+
+    def run_scheduled(self, drift: float):
+        if not self.is_running():
+            self.close()
+            return None
+        self.poll()
+        return self.get_timeout()
 
     def get_config_value(self, identifier):
         current_config = self.config
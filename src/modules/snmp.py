@@ -1,47 +1,84 @@
 from src.modules.module import Module
+from src.worker_pools import WorkerPools
 from src.device import Device
-from src.module_data import ModuleData, OutputType, Event, EventSeverity, LiveData
+from src.module_data import ModuleData, OutputType, Event, EventSeverity, LiveDataBatch
 from src.utilities import Utilities
 import src.modules.helpers.snmp as snmp
+from src.modules.helpers.counter_rates import CounterRates
 from src.settings import Settings, SettingsItem, SettingsItemType
 
 
 class SNMP(Module):
+    family = "snmp"
+
     def __init__(self, ip: str = None, timeout: int = None, *args, **kwargs):
         super().__init__(ip, timeout, *args, **kwargs)
         self.ip = ip
         self.__update_config()
         self._logger = Utilities.setup_logger()
-        self.__ds = snmp.DataSources(snmp.SNMP(self.community_string, ip, self.port))
+        self.__snmp = snmp.SNMP(self.community_string, ip, self.port, self.version, self.max_repetitions)
+        self.__ds = snmp.DataSources(self.__snmp, self.static_interval)
+        self.__async_snmp = None  # created on the event loop of the asyncio runtime
+        self.__async_ds = None
+        self.__rates = CounterRates()
 
     def __update_config(self):
         self.community_string = self.get_config_value("SNMP_COMMUNITY")
         self.port = self.get_config_value("SNMP_PORT")
+        self.version = self.get_config_value("SNMP_VERSION") or "2c"
+        self.max_repetitions = self.get_config_value("SNMP_MAX_REPETITIONS") or 25
+        self.static_interval = int(self.get_config_value("SNMP_STATIC_INTERVAL") or 3600)
 
     @staticmethod
     def config_template():
         settings = Settings(default_timeout=30*60)
         settings.add(SettingsItem(SettingsItemType.STRING, "SNMP_COMMUNITY", "community string", "community_string"))
         settings.add(SettingsItem(SettingsItemType.NUMBER, "SNMP_PORT", "port", 161))
+        settings.add(SettingsItem(SettingsItemType.ENUM, "SNMP_VERSION", "version", "2c", ["1", "2c"],
+                                  settings_required=False))
+        settings.add(SettingsItem(SettingsItemType.NUMBER, "SNMP_MAX_REPETITIONS", "GETBULK max-repetitions", 25,
+                                  settings_required=False))
+        settings.add(SettingsItem(SettingsItemType.NUMBER, "SNMP_STATIC_INTERVAL",
+                                  "interval of static interface columns in seconds", 3600, settings_required=False))
         return settings
 
+    def close(self):
+        self.__snmp.close()
+        if self.__async_snmp is not None:
+            self.__async_snmp.close()
+
+    async def poll_async(self):
+        # the SNMP requests of all devices share the event loop instead of one thread per device
+        if self.__async_snmp is None:
+            self.__async_snmp = snmp.AsyncSNMP(self.community_string, self.ip, self.port, self.version,
+                                               self.max_repetitions)
+            self.__async_ds = snmp.AsyncDataSources(self.__async_snmp, self.static_interval)
+        async with WorkerPools.get(self.family).limit():
+            self.check_last_updated()
+            self.data = await self.collect(self.__async_ds)
+
     def worker(self):
+        return self.__snmp.run(self.collect(self.__ds.async_data_sources))
+
+    async def collect(self, ds: snmp.AsyncDataSources):
         # self._logger.info(f"starting to fetch SNMP information from device with IP: {self.ip}")
         # return ModuleData(static_data={}, live_data={}, events={})
 
         #return ModuleData({}, [], [Event("successfully sent", EventSeverity.DEBUG)], OutputType.DEFAULT)
         static_data = {}
-        live_data = []
+        live_data = LiveDataBatch()
 
-        static_data.update(self.__ds.get_system_data())
-        static_data.update(self.__ds.get_services())
-        interfaces_static, interfaces_live = self.__ds.get_interfaces()
+        static_data.update(await ds.get_system_data())
+        static_data.update(await ds.get_services())
+        interfaces_static, interfaces_live = await ds.get_interfaces()
         static_data.update({"network_interfaces": interfaces_static})
-        for key, val in interfaces_live.items():
-            for i_key, i_val in val.items():
-                live_data.append(LiveData(i_key, float(i_val), (key,)))  # TODO: mapping tuple?
+        # the counters are sent as per second rates, the first sample after a start or reboot has none
+        samples = {(key, i_key): i_val for key, val in interfaces_live.items() for i_key, i_val in val.items()}
+        rates = self.__rates.update(samples, static_data["system"]["uptime"], ds.counter64)
+        for (key, i_key), rate in rates.items():
+            live_data.append(f"{i_key}_per_second", rate, (key,))  # TODO: mapping tuple?
         # data.update(self.__ds.get_ip_data())
-        static_data.update(self.__ds.get_ip_addresses())
+        static_data.update(await ds.get_ip_addresses())
         # TODO: add other DataSource functions above
 
         # self._logger.spam(data)
@@ -2,6 +2,7 @@ from src.modules.module import Module
 from decouple import config
 from src.module_data import ModuleData, OutputType, Event, EventSeverity
 from src.modules.helpers.s350_ssh_vlan import Vlan
+from src.modules.helpers.napalm_sessions import NapalmSessions
 from src.settings import Settings, SettingsItem, SettingsItemType
 import sys
 import time
@@ -11,6 +12,8 @@ import json
 
 
 class SSH(Module):
+    family = "ssh"
+
     def __init__(self, ip: str = None, timeout: int = None, *args, **kwargs):
         super().__init__(ip, timeout, *args, **kwargs)
         self.ip = ip
@@ -32,17 +35,13 @@ class SSH(Module):
         else:
             self.dev_creds['optional_args']['force_no_enable'] = True
 
-    def __create_connection(self):
+    def __get_session(self):
         self.__update_config()  # the config needs to be updated in case the user changes the config while the program runs
-        print(self.dev_type)
-        driver = napalm.get_network_driver(self.dev_type)
-        self.conn = driver(**self.dev_creds)
-        self.conn.open()
+        return NapalmSessions.get(self.dev_type, self.dev_creds)
 
-    def get_lldp_infos(self):
-        self.__create_connection()
-        interface_output = self.conn.get_interfaces()
-        lldp_output = self.conn.get_lldp_neighbors_detail()
+    def get_lldp_infos(self, conn):
+        interface_output = conn.get_interfaces()
+        lldp_output = conn.get_lldp_neighbors_detail()
         neighbors = {}
 
         for portname, data in lldp_output.items():
@@ -58,37 +57,30 @@ class SSH(Module):
                 }]
             }
             neighbors.update(neighbor)
-        self.conn.close()
         self._logger.spam(neighbors)
         return {"neighbors": neighbors}
 
     @staticmethod
     def reformat_vlan_data(vlans):
-        vlan_results = []
-        ports = []  # memorize all ports already in the output variable
+        ports = {}  # all ports already in the output, in order of their first appearance
         for vlan_id, vlan_data in vlans.items():
             vlan_name = vlan_data["name"]
             interfaces = vlan_data["interfaces"]
             for interface in interfaces:
                 if interface in ports:  # update an existing port in the out var
-                    port_index = ports.index(interface)
-                    vlan_results[port_index]["vlans"].append({"id": vlan_id, "name": vlan_name})
+                    ports[interface]["vlans"].append({"id": vlan_id, "name": vlan_name})
                 else:  # add a new port to the output var
-                    vlan_results.append({
+                    ports[interface] = {
                         "port": interface,
                         "vlans": [{"id": vlan_id, "name": vlan_name}]
-                    })
-                    ports.append(interface)
-        return vlan_results
+                    }
+        return list(ports.values())
 
-    def get_vlan_infos(self):
-        self.__update_config()
+    def get_vlan_infos(self, conn):
         if self.dev_type == "s350":  # s350 device need special treatment since there is no native napalm integration for those products
-            vlan_data = Vlan(self.dev_creds).get_vlan_data()
+            vlan_data = Vlan(self.dev_creds).get_vlan_data(conn)
         else:
-            self.__create_connection()
-            vlans = self.conn.get_vlans()
-            self.conn.close()
+            vlans = conn.get_vlans()
             vlan_data = SSH.reformat_vlan_data(vlans)  # reformats the data to an interface centric design
         self._logger.spam(vlan_data)
         return {"vlan": vlan_data}
@@ -106,9 +98,17 @@ class SSH(Module):
         # the transport protocol is the protocol used for the nexus API requests - nexus does not use SSH
         return settings
 
-    def worker(self):
+    def close(self):
+        NapalmSessions.close(self.ip)
+
+    def collect(self, conn):
         data = {}
-        data.update(self.get_lldp_infos())
-        data.update(self.get_vlan_infos())
+        data.update(self.get_lldp_infos(conn))
+        data.update(self.get_vlan_infos(conn))
+        return data
+
+    def worker(self):
+        # all getters share the session of the device, it stays open for the next cycles
+        data = self.__get_session().run(self.collect)
         return ModuleData(data, [], {}, OutputType.DEFAULT)
 
@@ -1,7 +1,8 @@
 from src.modules.module import Module
 from src.device import Device
 from src.module_data import ModuleData, OutputType, LiveData
-from unificontrol import UnifiClient
+from src.modules.helpers.unifi_cache import UnifiCache
+from src.modules.helpers.sessions import Sessions
 from src.settings import Settings, SettingsItem, SettingsItemType
 import time
 
@@ -48,6 +49,8 @@ class UnifiDevice:
 
 
 class UnifiAPI(Module):
+    family = "unifi"
+
     def __init__(self, ip: str = None, timeout: int = None, *args, **kwargs):
         super().__init__(ip, timeout, *args, **kwargs)
 
@@ -57,91 +60,90 @@ class UnifiAPI(Module):
         self.connection = self.__create_connection()
 
     def __create_connection(self):
-        return UnifiClient(host=self.host, username=self.user, password=self.password)
+        return Sessions.get_unifi(self.host, self.user, self.password)
+
+    @staticmethod
+    def _get_network_obj(networks_by_id, key):
+        return networks_by_id.get(key)
+
+    @staticmethod
+    def _get_portconfig_obj(port_conf_by_id, key):
+        return port_conf_by_id.get(key)
 
-    def _get_network_obj(self, network, key):
-        for network_obj in network:
-            if network_obj["_id"] == key:
-                return network_obj
+    def get_inventory(self):
+        return UnifiCache.get(self.host, self.connection)
 
-    def _get_portconfig_obj(self, port_config, key):
-        for portconfig_obj in port_config:
-            if portconfig_obj["_id"] == key:
-                return portconfig_obj
+    def __get_device(self, inventory):
+        if self.ip not in inventory.devices_by_ip:
+            self._logger.warning(f"device {self.ip} not found on the controller {self.host}")
+            return None
+        return inventory.devices_by_ip[self.ip]
 
     def get_lldp_data(self):
-        mac = ""
-        hostname = ""
+        inventory = self.get_inventory()
+        device_data = self.__get_device(inventory)
+        return UnifiAPI.build_lldp_data(inventory, device_data) if device_data is not None else {}
 
-        all_devices = self.connection.list_devices()
-        for obj_ in all_devices:
-            if obj_["ip"] == self.ip:
-                mac = obj_["mac"]
-
-        all_clients = self.connection.list_clients()
-        devices = self.connection.list_devices(device_mac=mac)
-        for device_data in devices:
-            lldp_device = device_data["lldp_table"]
-            lldp_list = []
-            for i in range(len(lldp_device)):
-                for clients in all_clients:
-                    if clients["mac"] == lldp_device[i]["chassis_id"]:
-                        if "hostname" in clients:
-                            hostname = clients["hostname"]
-
-                        lldp = UnifiLLDP(local_mac=mac, chassis_id=lldp_device[i]["chassis_id"], remote_host=hostname,
-                                         local_port_idx=lldp_device[i]["local_port_idx"],
-                                         port_id=lldp_device[i]["port_id"])
-                        lldp_list.append(lldp.serialize())
-
-            output_data = {}
-            for c_lldp_data in lldp_list:
-                if c_lldp_data["local_port"] not in output_data:
-                    output_data[c_lldp_data["local_port"]] = []
-                output_data[c_lldp_data["local_port"]].append(c_lldp_data)
-
-            return output_data
+    @staticmethod
+    def build_lldp_data(inventory, device_data):
+        hostname = ""
+        mac = device_data["mac"]
+        lldp_device = device_data["lldp_table"]
+        lldp_list = []
+        for i in range(len(lldp_device)):
+            for clients in inventory.clients_by_mac.get(lldp_device[i]["chassis_id"], []):
+                if "hostname" in clients:
+                    hostname = clients["hostname"]
+
+                lldp = UnifiLLDP(local_mac=mac, chassis_id=lldp_device[i]["chassis_id"], remote_host=hostname,
+                                 local_port_idx=lldp_device[i]["local_port_idx"],
+                                 port_id=lldp_device[i]["port_id"])
+                lldp_list.append(lldp.serialize())
+
+        output_data = {}
+        for c_lldp_data in lldp_list:
+            if c_lldp_data["local_port"] not in output_data:
+                output_data[c_lldp_data["local_port"]] = []
+            output_data[c_lldp_data["local_port"]].append(c_lldp_data)
+
+        return output_data
 
     def get_vlan_data(self):
+        inventory = self.get_inventory()
+        device_data = self.__get_device(inventory)
+        return UnifiAPI.build_vlan_data(inventory, device_data) if device_data is not None else []
+
+    @staticmethod
+    def build_vlan_data(inventory, device_data):
         is_trunk = False
         vlandata = []
 
-        alldevices = self.connection.list_devices()
-        for obj in alldevices:
-            if obj["ip"] == self.ip:
-                mac = obj["mac"]
-                break
-
-        port_conf = self.connection.list_portconf()
-        networks = self.connection.list_networkconf()
-
-        vlan_device = self.connection.list_devices(mac)
-        for devices in vlan_device:
-            port_table = devices["port_table"]
-            for port in port_table:
-                port_idx = port["port_idx"]
-                port_status = port["name"]
-
-                port_conf_obj = self._get_portconfig_obj(port_conf, port["portconf_id"])
-                admin_status = "down" if port_status == "Disabled" else "up"
-
-                if "native_networkconf_id" in port_conf_obj:
-                    network_obj = self._get_network_obj(networks, port_conf_obj["native_networkconf_id"])
-                    if network_obj["_id"] == port_conf_obj["native_networkconf_id"]:
-                        is_trunk = False
-                        vlan = UnifiVLAN(local_port_name=port_idx, vlan_name=network_obj["name"],
-                                         vlan_id=network_obj["vlan"], admin_status=admin_status)
-                    else:
-                        vlan = None
+        port_table = device_data["port_table"]
+        for port in port_table:
+            port_idx = port["port_idx"]
+            port_status = port["name"]
+
+            port_conf_obj = UnifiAPI._get_portconfig_obj(inventory.port_conf_by_id, port["portconf_id"])
+            admin_status = "down" if port_status == "Disabled" else "up"
+
+            if "native_networkconf_id" in port_conf_obj:
+                network_obj = UnifiAPI._get_network_obj(inventory.networks_by_id,
+                                                        port_conf_obj["native_networkconf_id"])
+                if network_obj["_id"] == port_conf_obj["native_networkconf_id"]:
+                    is_trunk = False
+                    vlan = UnifiVLAN(local_port_name=port_idx, vlan_name=network_obj["name"],
+                                     vlan_id=network_obj["vlan"], admin_status=admin_status)
                 else:
-                    is_trunk = True
-                    vlan = UnifiVLAN(local_port_name=port_idx, vlan_name="Default",
-                                     vlan_id=-1, admin_status=admin_status)
-                vlan_dict = vlan.serialize()
-                vlan_list = [vlan_dict]
-
-                port_dict = {"port": port_idx, "vlans": vlan_list, "is_trunk": is_trunk}
-                vlandata.append(port_dict)
+                    vlan = None
+            else:
+                is_trunk = True
+                vlan = UnifiVLAN(local_port_name=port_idx, vlan_name="Default",
+                                 vlan_id=-1, admin_status=admin_status)
+            vlan_dict = vlan.serialize()
+            vlan_list = [vlan_dict]
+
+            port_dict = {"port": port_idx, "vlans": vlan_list, "is_trunk": is_trunk}
+            vlandata.append(port_dict)
 
         return vlandata
 
@@ -2,7 +2,8 @@ import math
 
 from src.modules.module import Module
 from src.device import Device
-from pyzabbix.api import ZabbixAPI
+from src.modules.helpers.sessions import Sessions
+from src.modules.helpers.zabbix_watermarks import ZabbixWatermarks
 from src.module_data import ModuleData, OutputType, LiveData
 import time
 from enum import Enum
@@ -45,6 +46,8 @@ class ZabbixDevice:
 
 
 class Zabbix(Module):
+    family = "zabbix"
+
     def __init__(self, ip: str = None, timeout: int = None, *args, **kwargs):
         super().__init__(ip, timeout, *args, **kwargs)
         self.url = f"https://{ip}"
@@ -52,33 +55,66 @@ class Zabbix(Module):
         self.user = self.get_config_value("ZABBIX_USERNAME")
         # self.password = self.config["password"]
         self.password = self.get_config_value("ZABBIX_PASSWORD")
+        self.chunk_size = int(self.get_config_value("ZABBIX_CHUNK_SIZE") or 500)
         self.connection = self.__create_connection()
 
     def __create_connection(self):
-        return ZabbixAPI(url=self.url, user=self.user, password=self.password)
+        return Sessions.get_zabbix(self.url, self.user, self.password)
+
+    @staticmethod
+    def chunks(items: list, size: int):
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def get_problem_objects(self, hostids: list):
+        """open problems of the hosts with the hostids of each problem"""
+        problems = self.connection.problem.get(hostids=hostids,
+                                               output=["eventid", "objectid", "name", "severity", "clock"])
+        # problem.get has no selectHosts, the hosts of a problem are the hosts of its trigger
+        trigger_hosts = {}
+        triggerids = list({problem["objectid"] for problem in problems})
+        for c_triggerids in Zabbix.chunks(triggerids, self.chunk_size):
+            for trigger in self.connection.trigger.get(triggerids=c_triggerids, output=["triggerid"],
+                                                       selectHosts=["hostid"]):
+                trigger_hosts[trigger["triggerid"]] = [host["hostid"] for host in trigger["hosts"]]
+        return [(problem, trigger_hosts.get(problem["objectid"], [])) for problem in problems]
+
+    def get_event_filter(self):
+        return {"time_from": int(time.time() - 86400)}
+
+    def get_event_objects(self, hostids: list):
+        """events of the hosts that match get_event_filter with the hostids of each event"""
+        events = self.connection.event.get(hostids=hostids, output=["eventid", "name", "severity", "clock"],
+                                           selectHosts=["hostid"], **self.get_event_filter())
+        return [(event, [host["hostid"] for host in event["hosts"]]) for event in events]
 
     def get_infos(self, hosts, zabbix_data_type: ZabbixDataType):
-        zabbix_devices = {}
-        for host in hosts:
-            z_device = ZabbixDevice(hostname=host["host"])
-            data_obj = None
+        # one request per ZABBIX_CHUNK_SIZE hosts instead of one per host, the results are grouped by host here
+        hostnames = {host["hostid"]: host["host"] for host in hosts}
+        z_devices = {}
+        for hostids in Zabbix.chunks(list(hostnames), self.chunk_size):
             if zabbix_data_type == ZabbixDataType.PROBLEMS:
-                data_obj = self.connection.problem.get(hostids=host['hostid'], selectHosts='extend')
-            elif zabbix_data_type == ZabbixDataType.EVENTS:
-                data_obj = self.connection.event.get(hostids=host['hostid'], time_from=time.time() - 86400)  # 86400
-            if data_obj:
-                for obj in data_obj:
-                    if zabbix_data_type == ZabbixDataType.EVENTS:
-                        c_severity = math.ceil((int(obj["severity"]) + 1)/2)
-                    else:
-                        c_severity = math.ceil((int(obj["severity"]) + 5)/2)
-                    c_problem = str.replace(obj["name"], '"', '')
-                    z_problem = ZabbixProblems(problem=c_problem, severity=c_severity, timestamp=obj["clock"])
-                    z_device.problems.append(z_problem)
-
-                    if not host["host"] in zabbix_devices:
-                        zabbix_devices[host["host"]] = []
-                    zabbix_devices.update(z_device.serialize())
+                data_obj = self.get_problem_objects(hostids)
+            else:
+                data_obj = self.get_event_objects(hostids)
+            chunk_hostids = set(hostids)
+            for obj, obj_hostids in data_obj:
+                if zabbix_data_type == ZabbixDataType.EVENTS:
+                    c_severity = math.ceil((int(obj["severity"]) + 1)/2)
+                else:
+                    c_severity = math.ceil((int(obj["severity"]) + 5)/2)
+                c_problem = str.replace(obj["name"], '"', '')
+                for hostid in obj_hostids:
+                    if hostid not in chunk_hostids:
+                        continue  # other hosts of the trigger are handled in their own chunk
+                    if hostid not in z_devices:
+                        z_devices[hostid] = ZabbixDevice(hostname=hostnames[hostid])
+                    z_devices[hostid].problems.append(ZabbixProblems(problem=c_problem, severity=c_severity,
+                                                                     timestamp=obj["clock"]))
+        zabbix_devices = {}
+        for hostid in hostnames:
+            if hostid in z_devices:
+                zabbix_devices.update(z_devices[hostid].serialize())
         return zabbix_devices
 
     def get_hosts(self):
@@ -90,6 +126,8 @@ class Zabbix(Module):
         settings = Settings(default_timeout=30*60)
         settings.add(SettingsItem(SettingsItemType.STRING, "ZABBIX_USERNAME", "username", "NetWatch"))
         settings.add(SettingsItem(SettingsItemType.STRING, "ZABBIX_PASSWORD", "password", "Password"))
+        settings.add(SettingsItem(SettingsItemType.NUMBER, "ZABBIX_CHUNK_SIZE", "hosts per API request", 500,
+                                  settings_required=False))
         return settings
 
 
@@ -106,9 +144,37 @@ class Problems(Zabbix):
 class Events(Zabbix):
     def __init__(self, ip: str = None, timeout: int = None, *args, **kwargs):
         super().__init__(ip, timeout, *args, **kwargs)
+        self.backfill = int(self.get_config_value("ZABBIX_EVENT_BACKFILL") or 86400)
+        self.__watermark = None
+        self.__latest = None
+
+    @staticmethod
+    def config_template():
+        settings = Zabbix.config_template()
+        settings.add(SettingsItem(SettingsItemType.NUMBER, "ZABBIX_EVENT_BACKFILL",
+                                  "seconds of events fetched without a watermark", 86400, settings_required=False))
+        return settings
+
+    def get_event_filter(self):
+        # only events after the watermark, never older than the backfill window
+        time_from = int(time.time()) - self.backfill
+        if self.__watermark is None:
+            return {"time_from": time_from}
+        return {"time_from": max(time_from, self.__watermark["clock"]),
+                "eventid_from": str(int(self.__watermark["eventid"]) + 1)}
+
+    def get_event_objects(self, hostids: list):
+        event_objects = super().get_event_objects(hostids)
+        for event, _ in event_objects:
+            if self.__latest is None or int(event["eventid"]) > int(self.__latest["eventid"]):
+                self.__latest = {"eventid": event["eventid"], "clock": int(event["clock"])}
+        return event_objects
 
     def worker(self):
         hosts = self.get_hosts()
+        self.__watermark = self.__latest = ZabbixWatermarks.get(self.url, self._logger)
         events = self.get_infos(hosts, ZabbixDataType.EVENTS)
+        # persisted by the devicehandler once the upload succeeded, until then every cycle fetches the same events
+        watermarks = {self.url: self.__latest} if self.__latest != self.__watermark else {}
         return ModuleData({}, [], events,
-                          OutputType.EXTERNAL_DATA_SOURCES)
\ No newline at end of file
+                          OutputType.EXTERNAL_DATA_SOURCES, watermarks)
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import threading
+from decouple import config
+from src.scheduler import Scheduler
+from src.utilities import Utilities
+from src.worker_pools import WorkerPools
+
+
+class Runtime:
+    def start(self, worker):
+        raise NotImplementedError
+
+    def is_alive(self, worker):
+        raise NotImplementedError
+
+    def update(self, worker):
+        """called after timeout or modules of a running worker were changed"""
+        pass
+
+    def stop(self, worker):
+        pass
+
+    def metrics(self) -> dict:
+        """runtime internals that are logged next to the worker pool metrics"""
+        return {}
+
+
+class ThreadRuntime(Runtime):
+    """one OS thread per Device and per Module (default)"""
+
+    def start(self, worker: threading.Thread):
+        worker.start()
+
+    def is_alive(self, worker: threading.Thread):
+        return worker.is_alive()
+
+
+class AsyncioRuntime(Runtime):
+    """Devices and Modules run as coroutines on a few event loops, blocking workers run in their worker pool"""
+
+    def __init__(self, loops: int = 1):
+        self._logger = Utilities.setup_logger()
+        self._loops = []
+        for index in range(max(loops, 1)):
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=self.__run_loop, args=(loop,), name=f"eventLoop{index}", daemon=True).start()
+            self._loops.append(loop)
+        self._loop_cycle = itertools.cycle(self._loops)
+
+    @staticmethod
+    def __run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def start(self, worker):
+        try:
+            # modules are started from within their device coroutine and stay on the same loop
+            loop = asyncio.get_running_loop()
+            task = loop.create_task(worker.run_async(self), name=worker.name)
+        except RuntimeError:
+            task = asyncio.run_coroutine_threadsafe(worker.run_async(self), next(self._loop_cycle))
+        task.add_done_callback(lambda c_task: self.__log_exception(worker, c_task))
+        worker.runtime_task = task
+
+    def is_alive(self, worker):
+        task = getattr(worker, "runtime_task", None)
+        return task is not None and not task.done()
+
+    def __log_exception(self, worker, task):
+        if not task.cancelled() and task.exception():
+            self._logger.error(f"{worker.name} stopped: {task.exception()!r}")
+
+
+class SchedulerRuntime(Runtime):
+    """Devices and Modules are jobs of one central deadline scheduler with jittered start times"""
+
+    def __init__(self, max_workers: int = 32, jitter: float = 300):
+        self._scheduler = Scheduler(max_workers=max_workers, jitter=jitter)
+
+    def start(self, worker):
+        # modules run in the pool of their family, devices only do bookkeeping in the scheduler executor
+        family = getattr(worker, "family", None)
+        pool = WorkerPools.get(family) if family else None
+        worker.runtime_task = self._scheduler.add(worker.run_scheduled, int(worker.timeout), pool, worker.name)
+
+    def is_alive(self, worker):
+        job = getattr(worker, "runtime_task", None)
+        return job is not None and not job.done()
+
+    def metrics(self):
+        return {"scheduler": self._scheduler.metrics()}
+
+
+def create_runtime(runtime: str = None):
+    if runtime is None:
+        runtime = config("RUNTIME", "threading", cast=str)
+        processes = config("PROCESSES", 1, cast=int)
+        if processes > 1:
+            from src.shard import ProcessRuntime  # src.shard runs devices and imports this module
+            return ProcessRuntime(processes, runtime)
+    if runtime == "asyncio":
+        return AsyncioRuntime(loops=config("ASYNC_LOOPS", 1, cast=int))
+    if runtime == "scheduler":
+        return SchedulerRuntime(max_workers=config("SCHEDULER_WORKERS", 32, cast=int),
+                                jitter=config("SCHEDULER_JITTER", 300, cast=float))
+    return ThreadRuntime()
@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from src.utilities import Utilities
+
+
+class ScheduledJob:
+    def __init__(self, callback: typing.Callable[[float], typing.Optional[float]], executor=None, name: str = None):
+        self.callback = callback
+        self.name = name
+        self.executor = executor
+        self.due = None
+        self.drift = 0.0  # seconds the last run started after its due time
+        self.max_drift = 0.0
+        self.__done = False
+
+    def cancel(self):
+        self.__done = True
+
+    def done(self):
+        return self.__done
+
+
+class Scheduler:
+    """
+    owns the next due time of every job in a heap and hands due jobs to a bounded executor.
+    a job callback gets the drift of the current run and returns the seconds until its next run (None stops the job)
+    """
+
+    def __init__(self, max_workers: int = 32, jitter: float = 300):
+        self._logger = Utilities.setup_logger()
+        self._heap = []
+        self._sequence = itertools.count()  # tie breaker, jobs are not comparable
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._jitter = jitter
+        self._jobs = set()
+        self._thread = threading.Thread(target=self.__dispatch, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def add(self, callback: typing.Callable[[float], typing.Optional[float]], interval: float,
+            executor=None, name: str = None) -> ScheduledJob:
+        """
+        the first run is spread randomly over min(jitter, interval) so jobs added together do not poll together.
+        executor overrides the executor of the scheduler for this job (e.g. the worker pool of a module family)
+        """
+        job = ScheduledJob(callback, executor, name)
+        with self._condition:
+            self._jobs.add(job)
+        self.__push(job, time.monotonic() + random.uniform(0, min(self._jitter, interval)))
+        return job
+
+    def __push(self, job: ScheduledJob, due: float):
+        with self._condition:
+            job.due = due
+            heapq.heappush(self._heap, (due, next(self._sequence), job))
+            self._condition.notify()
+
+    def __dispatch(self):
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._condition.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                due, _, job = heapq.heappop(self._heap)
+            if not job.done():
+                (job.executor or self._executor).submit(self.__execute, job, due)
+            else:
+                self.__remove(job)
+
+    def __execute(self, job: ScheduledJob, due: float):
+        job.drift = time.monotonic() - due
+        job.max_drift = max(job.max_drift, job.drift)
+        try:
+            interval = job.callback(job.drift)
+        except Exception as ex:
+            self._logger.error(f"scheduled job {job.callback} stopped: {ex!r}")
+            interval = None
+        if interval is None or job.done():
+            job.cancel()
+            self.__remove(job)
+        else:
+            # keep the phase of the job, a late run does not shift all following runs. missed runs are skipped
+            self.__push(job, max(due + interval, time.monotonic()))
+
+    def __remove(self, job: ScheduledJob):
+        with self._condition:
+            self._jobs.discard(job)
+
+    def metrics(self):
+        """drift of the last run of the jobs, how late they started after their due time"""
+        with self._condition:
+            jobs = list(self._jobs)
+        return {
+            "jobs": len(jobs),
+            "average_drift": sum(job.drift for job in jobs) / len(jobs) if jobs else 0.0,
+            "max_drift": max((job.drift for job in jobs), default=0.0),
+            "max_drift_ever": max((job.max_drift for job in jobs), default=0.0),
+            # per job, so a device or module that keeps running late can be found
+            "jobs_drift": {job.name or str(job.callback): {"drift": job.drift, "max_drift": job.max_drift}
+                           for job in jobs}
+        }
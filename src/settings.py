@@ -64,6 +64,11 @@ class Settings:
     def seed_default_values(self):
         self.add(SettingsItem(settings_type=SettingsItemType.NUMBER, settings_id="timeout", settings_title="Timeout",
                               settings_default_value=self.default_timeout))
+        self.add(SettingsItem(SettingsItemType.NUMBER, "live_data_buffer_size",
+                              "live data samples kept per metric until the upload", 360, settings_required=False))
+        self.add(SettingsItem(SettingsItemType.STRING, "live_data_aggregation",
+                              "aggregations per upload (min,max,avg,last), empty uploads every sample", "",
+                              settings_required=False))
 
 
 if __name__ == "__main__":
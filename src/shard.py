@@ -0,0 +1,119 @@
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from decouple import config
+from src.device import Device
+from src.runtime import Runtime, create_runtime
+from src.utilities import Utilities
+
+
+class Shard:
+    def __init__(self, index: int, process: multiprocessing.Process, commands: multiprocessing.Queue):
+        self.index = index
+        self.process = process
+        self.commands = commands
+
+
+class ProcessRuntime(Runtime):
+    """
+    splits devices over child processes by a stable hash of the device id. the devices in the parent only
+    hold the data their shard sends back, login and upload stay in the parent process
+    """
+
+    def __init__(self, processes: int, runtime: str):
+        self._logger = Utilities.setup_logger()
+        self._context = multiprocessing.get_context("spawn")
+        self._runtime = runtime
+        self._results = self._context.Queue()
+        self._shards = [None] * processes
+        self._devices = {}
+        self._sent_settings = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self.__collect_results, name="shardResults", daemon=True).start()
+
+    def shard_index(self, device_id) -> int:
+        return zlib.crc32(str(device_id).encode()) % len(self._shards)
+
+    def __get_shard(self, device_id) -> Shard:
+        index = self.shard_index(device_id)
+        with self._lock:
+            if self._shards[index] is None or not self._shards[index].process.is_alive():
+                commands = self._context.Queue()
+                process = self._context.Process(target=run_shard, args=(self._runtime, commands, self._results),
+                                                name=f"shard{index}", daemon=True)
+                process.start()
+                self._shards[index] = Shard(index, process, commands)
+                self._logger.info(f"Started shard {index} (pid {process.pid})")
+            return self._shards[index]
+
+    @staticmethod
+    def __settings(device: Device):
+        return {"id_": device.id, "name": device.name, "ip": device.ip, "device_type": device.device_type,
+                "timeout": device.timeout, "modules": device.modules}
+
+    def start(self, device: Device):
+        self._devices[device.id] = device
+        self._sent_settings[device.id] = self.__settings(device)
+        self.__get_shard(device.id).commands.put(("start", self._sent_settings[device.id]))
+
+    def is_alive(self, device: Device):
+        shard = self._shards[self.shard_index(device.id)]
+        return self._devices.get(device.id) is device and shard is not None and shard.process.is_alive()
+
+    def update(self, device: Device):
+        settings = self.__settings(device)
+        if self._sent_settings.get(device.id) != settings:
+            self._sent_settings[device.id] = settings
+            self.__get_shard(device.id).commands.put(("update", settings))
+
+    def stop(self, device: Device):
+        self._devices.pop(device.id, None)
+        self._sent_settings.pop(device.id, None)
+        shard = self._shards[self.shard_index(device.id)]
+        if shard is not None and shard.process.is_alive():
+            shard.commands.put(("stop", device.id))
+
+    def __collect_results(self):
+        while True:
+            device_id, device_data = self._results.get()
+            device = self._devices.get(device_id)
+            if device:
+                device.add_data(device_data)
+
+
+def run_shard(runtime_name: str, commands: multiprocessing.Queue, results: multiprocessing.Queue):
+    """entry point of a shard process: runs its devices and sends their data to the parent"""
+    runtime = create_runtime(runtime_name)
+    interval = config("UPLOAD_INTERVAL", 5, cast=int)
+    devices = {}
+    next_upload = time.monotonic() + interval
+    while True:
+        try:
+            command, payload = commands.get(timeout=max(next_upload - time.monotonic(), 0))
+            if command == "start":
+                if payload["id_"] in devices:
+                    devices[payload["id_"]].running = False
+                devices[payload["id_"]] = Device(runtime=runtime, **payload)
+                runtime.start(devices[payload["id_"]])
+            elif command == "update" and payload["id_"] in devices:
+                devices[payload["id_"]].timeout = payload["timeout"]
+                devices[payload["id_"]].modules = payload["modules"]
+            elif command == "stop" and payload in devices:
+                devices.pop(payload).running = False
+        except queue.Empty:
+            pass
+        if time.monotonic() < next_upload:
+            continue
+        next_upload = time.monotonic() + interval
+        for device_id, device in list(devices.items()):
+            device_data = device.pop_data()
+            if not device_data.is_empty():
+                results.put((device_id, device_data))
+            # restart dead devices like DeviceHandler.check_devices does in a single process
+            if not runtime.is_alive(device) or not device.running:
+                devices[device_id] = Device(runtime=runtime, id_=device.id, name=device.name, ip=device.ip,
+                                            device_type=device.device_type, timeout=device.timeout,
+                                            modules=device.modules)
+                runtime.start(devices[device_id])
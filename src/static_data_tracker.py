@@ -0,0 +1,70 @@
+import hashlib
+import json
+import time
+from decouple import config
+
+
+class StaticDataTracker:
+    """
+    remembers a content hash of every static_data section (system, network_interfaces, ...) the backend has
+    received per device, so unchanged sections are left out of the next upload. the backend already merges
+    the sections of a device across uploads, the names of the omitted sections are listed in
+    "static_data_unchanged". all hashes are forgotten every STATIC_DATA_RESYNC seconds or when the
+    backend answers with "resend_static_data"
+    """
+
+    def __init__(self, enabled: bool = True, resync_interval: int = 3600):
+        self.enabled = enabled
+        self.resync_interval = resync_interval
+        self.__hashes = {}  # device id -> {section: hash}
+        self.__pending = {}
+        self.__last_resync = time.monotonic()
+
+    @staticmethod
+    def from_config():
+        return StaticDataTracker(enabled=config("STATIC_DATA_DELTA", True, cast=bool),
+                                 resync_interval=config("STATIC_DATA_RESYNC", 3600, cast=int))
+
+    @staticmethod
+    def section_hash(value) -> bytes:
+        return hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode(), digest_size=16).digest()
+
+    def changed_sections(self, device_id, static_data: dict):
+        """static_data without the sections the backend already has and the names of those sections"""
+        if not self.enabled:
+            return static_data, []
+        if time.monotonic() - self.__last_resync >= self.resync_interval:
+            self.resend()
+        device_id = str(device_id)
+        known = self.__hashes.get(device_id, {})
+        changed, unchanged = {}, []
+        for section, value in static_data.items():
+            c_hash = StaticDataTracker.section_hash(value)
+            if known.get(section) == c_hash:
+                unchanged.append(section)
+            else:
+                changed[section] = value
+                self.__pending.setdefault(device_id, {})[section] = c_hash
+        return changed, unchanged
+
+    def commit(self):
+        """the upload succeeded, the backend has the sections of changed_sections now"""
+        for device_id, hashes in self.__pending.items():
+            self.__hashes.setdefault(device_id, {}).update(hashes)
+        self.__pending = {}
+
+    def discard(self):
+        """the upload failed, the changed sections are sent again"""
+        self.__pending = {}
+
+    def resend(self, device_ids: list = None):
+        """the next upload contains every section again, of all devices or only of device_ids"""
+        if device_ids is None:
+            self.__hashes = {}
+            self.__last_resync = time.monotonic()
+        else:
+            for device_id in device_ids:
+                self.__hashes.pop(str(device_id), None)
+
+    def forget(self, device_id):
+        self.__hashes.pop(str(device_id), None)
@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, Future
+from decouple import config
+
+
+class WorkerPool:
+    """bounded executor for one module family that keeps queue depth and wait time metrics"""
+
+    def __init__(self, family: str, max_workers: int):
+        self.family = family
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{family}Pool")
+        self._lock = threading.Lock()
+        self.queued = 0  # submitted but waiting for a free worker
+        self.active = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+
+    def __enqueued(self):
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+    def __started(self, submitted: float):
+        wait = time.monotonic() - submitted
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def __finished(self):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+
+    def submit(self, func, *args) -> Future:
+        self.__enqueued()
+        return self._executor.submit(self.__run, time.monotonic(), func, *args)
+
+    def __run(self, submitted: float, func, *args):
+        self.__started(submitted)
+        try:
+            return func(*args)
+        finally:
+            self.__finished()
+
+    @contextlib.asynccontextmanager
+    async def limit(self):
+        """slot of this pool for coroutines, at most max_workers of them run at once on each event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._semaphores:
+                self._semaphores[loop] = asyncio.Semaphore(self.max_workers)
+            semaphore = self._semaphores[loop]
+        self.__enqueued()
+        submitted = time.monotonic()
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        self.__started(submitted)
+        try:
+            yield
+        finally:
+            semaphore.release()
+            self.__finished()
+
+    def metrics(self):
+        with self._lock:
+            started = self.completed + self.active
+            return {
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "average_wait": self.total_wait / started if started else 0.0,
+                "max_wait": self.max_wait
+            }
+
+
+class WorkerPools:
+    """process wide registry, the size of each pool is read from <FAMILY>_POOL_SIZE"""
+    default_sizes = {
+        "snmp": 32,
+        "ssh": 8,
+        "unifi": 4,
+        "zabbix": 4
+    }
+    __pools = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get(family: str) -> WorkerPool:
+        with WorkerPools.__lock:
+            if family not in WorkerPools.__pools:
+                size = config(f"{family.upper()}_POOL_SIZE", WorkerPools.default_sizes.get(family, 16), cast=int)
+                WorkerPools.__pools[family] = WorkerPool(family, size)
+            return WorkerPools.__pools[family]
+
+    @staticmethod
+    def metrics():
+        with WorkerPools.__lock:
+            pools = dict(WorkerPools.__pools)
+        return {family: pool.metrics() for family, pool in pools.items()}
@@ -0,0 +1,337 @@
+"""
+local stand-in for switches: UDP SNMP agents (v1 and v2c) that serve synthetic SNMPv2-MIB, IF-MIB and IP-MIB data.
+
+    python -m tools.snmp_simulator --agents 100 --first-port 20000 --interfaces 48 --latency 0.005 --loss 0.01
+
+agent n listens on first-port + n and simulates a device with its own sysName, interfaces and counters. the
+octet counters grow with a fixed rate per interface, so the 32 bit counters of fast interfaces wrap like on a
+real switch. faults can be injected per agent: latency before every response, a packet loss ratio and a maximum
+response size above which the agent answers tooBig
+"""
+import argparse
+import asyncio
+import bisect
+import random
+import threading
+import time
+from pysnmp.proto import api
+from pyasn1.codec.ber import decoder
+
+SYSTEM = (1, 3, 6, 1, 2, 1, 1)
+IF_NUMBER = (1, 3, 6, 1, 2, 1, 2, 1, 0)
+IF_ENTRY = (1, 3, 6, 1, 2, 1, 2, 2, 1)
+IP = (1, 3, 6, 1, 2, 1, 4)
+IP_ADDR_ENTRY = (1, 3, 6, 1, 2, 1, 4, 20, 1)
+IF_TABLE_LAST_CHANGE = (1, 3, 6, 1, 2, 1, 31, 1, 5, 0)
+IF_X_ENTRY = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1)
+
+
+class SimulatedDevice:
+    """the MIB of one device: sorted OIDs and their (type, value), value may be a callable for counters"""
+
+    def __init__(self, index: int, interfaces: int = 24, seed: int = None):
+        self.index = index
+        self.started = time.monotonic()
+        self.__random = random.Random(index if seed is None else seed)
+        self.__uptime_offset = self.__random.randrange(100, 10 ** 8)  # ticks the device was up before the start
+        self.__objects = {}
+        self.__add_system()
+        self.__add_interfaces(interfaces)
+        self.__add_ip()
+        self.__oids = sorted(self.__objects)
+
+    def __add(self, oid: tuple, value_type: str, value):
+        self.__objects[oid] = (value_type, value)
+
+    def uptime(self) -> int:
+        return self.__uptime_offset + int((time.monotonic() - self.started) * 100)
+
+    def __counter(self, rate: float, start: int):
+        return lambda: start + int(rate * (time.monotonic() - self.started))
+
+    def __add_system(self):
+        self.__add(SYSTEM + (1, 0), "string", f"simulated switch {self.index}, netregator snmp simulator")
+        self.__add(SYSTEM + (2, 0), "oid", (1, 3, 6, 1, 4, 1, 8072, 3, 2, 10))
+        self.__add(SYSTEM + (3, 0), "ticks", self.uptime)
+        self.__add(SYSTEM + (4, 0), "string", "noc@example.com")
+        self.__add(SYSTEM + (5, 0), "string", f"switch-{self.index}")
+        self.__add(SYSTEM + (6, 0), "string", f"rack {self.index % 42}")
+        self.__add(SYSTEM + (7, 0), "integer", 6)
+
+    def __add_interfaces(self, interfaces: int):
+        self.__add(IF_NUMBER, "integer", interfaces)
+        self.__add(IF_TABLE_LAST_CHANGE, "ticks", 0)
+        for c_if in range(1, interfaces + 1):
+            speed = self.__random.choice([10 ** 9, 10 ** 10])
+            in_rate = self.__random.uniform(0, speed / 8)
+            out_rate = self.__random.uniform(0, speed / 8)
+            in_start = self.__random.randrange(2 ** 40)
+            out_start = self.__random.randrange(2 ** 40)
+            columns = {
+                1: ("integer", c_if),
+                2: ("string", f"TenGigabitEthernet1/0/{c_if}"),
+                3: ("integer", 6),  # ethernetCsmacd
+                4: ("integer", 1500),
+                5: ("gauge", min(speed, 2 ** 32 - 1)),
+                6: ("string", bytes([0, 0x11, 0x22, self.index // 256 % 256, self.index % 256, c_if % 256])),
+                7: ("integer", 1),
+                8: ("integer", 1 if c_if % 4 else 2),
+                9: ("ticks", self.__random.randrange(10 ** 6)),
+                10: ("counter", self.__counter(in_rate, in_start)),
+                11: ("counter", self.__counter(in_rate / 800, 0)),
+                12: ("counter", self.__counter(in_rate / 80000, 0)),
+                13: ("counter", 0),
+                14: ("counter", self.__counter(0.01, 0)),
+                15: ("counter", 0),
+                16: ("counter", self.__counter(out_rate, out_start)),
+                17: ("counter", self.__counter(out_rate / 800, 0)),
+                18: ("counter", self.__counter(out_rate / 80000, 0)),
+                19: ("counter", 0),
+                20: ("counter", 0)
+            }
+            for column, (value_type, value) in columns.items():
+                self.__add(IF_ENTRY + (column, c_if), value_type, value)
+            self.__add(IF_X_ENTRY + (1, c_if), "string", f"Te1/0/{c_if}")
+            self.__add(IF_X_ENTRY + (6, c_if), "counter64", self.__counter(in_rate, in_start))
+            self.__add(IF_X_ENTRY + (10, c_if), "counter64", self.__counter(out_rate, out_start))
+
+    def __add_ip(self):
+        self.__add(IP + (1, 0), "integer", 2)  # notForwarding
+        self.__add(IP + (2, 0), "integer", 64)
+        self.__add(IP + (13, 0), "integer", 30)
+        for c_scalar in (3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 19, 23):
+            self.__add(IP + (c_scalar, 0), "counter", self.__counter(self.__random.uniform(0, 1000), 0))
+        for address, if_index, netmask in (((127, 0, 0, 1), 1, (255, 0, 0, 0)),
+                                           ((10, (self.index + 1) // 65536 % 256, (self.index + 1) // 256 % 256,
+                                             (self.index + 1) % 256), 1, (255, 0, 0, 0))):
+            self.__add(IP_ADDR_ENTRY + (1,) + address, "ip", bytes(address))
+            self.__add(IP_ADDR_ENTRY + (2,) + address, "integer", if_index)
+            self.__add(IP_ADDR_ENTRY + (3,) + address, "ip", bytes(netmask))
+            self.__add(IP_ADDR_ENTRY + (4,) + address, "integer", 1)
+
+    def get(self, oid: tuple, v1: bool = False):
+        """(type, value) of the object or None"""
+        if oid not in self.__objects or (v1 and self.__objects[oid][0] == "counter64"):
+            return None
+        value_type, value = self.__objects[oid]
+        return value_type, value() if callable(value) else value
+
+    def next(self, oid: tuple, v1: bool = False):
+        """(oid, type, value) of the first object after oid or None at the end of the MIB"""
+        position = bisect.bisect_right(self.__oids, oid)
+        while position < len(self.__oids):
+            next_oid = self.__oids[position]
+            value = self.get(next_oid, v1)
+            if value is not None:  # SNMPv1 has no Counter64, those objects are skipped
+                return (next_oid,) + value
+            position += 1
+        return None
+
+
+# responses are BER encoded by hand, building them with pyasn1 objects costs more than the clients being measured
+TAGS = {
+    "integer": 0x02,
+    "string": 0x04,
+    "null": 0x05,
+    "oid": 0x06,
+    "ip": 0x40,
+    "counter": 0x41,
+    "gauge": 0x42,
+    "ticks": 0x43,
+    "counter64": 0x46,
+    "noSuchObject": 0x80,
+    "endOfMibView": 0x82
+}
+ERROR_STATUS = {"tooBig": 1, "noSuchName": 2, "genErr": 5}
+MODULO = {"counter": 2 ** 32, "gauge": 2 ** 32, "ticks": 2 ** 32, "counter64": 2 ** 64}
+
+
+def ber_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes([length])
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([0x80 | len(encoded)]) + encoded
+
+
+def ber(tag: int, content: bytes) -> bytes:
+    return bytes([tag]) + ber_length(len(content)) + content
+
+
+def ber_integer(value: int, tag: int = 0x02) -> bytes:
+    return ber(tag, value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True))
+
+
+def ber_oid(oid: tuple) -> bytes:
+    content = bytearray([oid[0] * 40 + oid[1]])
+    for arc in oid[2:]:
+        chunk = [arc & 0x7f]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | arc & 0x7f)
+            arc >>= 7
+        content.extend(reversed(chunk))
+    return ber(0x06, bytes(content))
+
+
+def ber_value(value_type: str, value) -> bytes:
+    if value_type in MODULO:
+        return ber_integer(value % MODULO[value_type], TAGS[value_type])
+    if value_type == "integer":
+        return ber_integer(value)
+    if value_type == "string":
+        return ber(0x04, value.encode() if isinstance(value, str) else value)
+    if value_type == "oid":
+        return ber_oid(value)
+    if value_type == "ip":
+        return ber(0x40, value)
+    return bytes([TAGS[value_type], 0])  # null and the SNMPv2 exceptions have no content
+
+
+class SimulatedAgent(asyncio.DatagramProtocol):
+    def __init__(self, device: SimulatedDevice, community: str = "public", latency: float = 0, loss: float = 0,
+                 max_response_size: int = 65507):
+        self.device = device
+        self.community = community
+        self.latency = latency
+        self.loss = loss
+        self.max_response_size = max_response_size
+        self.transport = None
+        self.requests = 0
+        self.__random = random.Random(device.index)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        if self.loss and self.__random.random() < self.loss:
+            return
+        try:
+            response = self.respond(data)
+        except Exception:
+            return  # garbage is dropped like a real agent does
+        if response is None:
+            return
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+    def respond(self, data: bytes):
+        version = int(api.decodeMessageVersion(data))
+        p_mod = api.protoModules[version]
+        v1 = version == api.protoVersion1
+        request, _ = decoder.decode(data, asn1Spec=p_mod.Message())
+        community = bytes(p_mod.apiMessage.getCommunity(request))
+        if community.decode(errors="replace") != self.community:
+            return None  # agents do not answer a wrong community
+        request_pdu = p_mod.apiMessage.getPDU(request)
+        oids = [tuple(oid) for oid, _ in p_mod.apiPDU.getVarBinds(request_pdu)]
+
+        var_binds = []  # (oid, type, value)
+        error = None
+        if request_pdu.isSameTypeWith(p_mod.GetRequestPDU()):
+            for c_index, oid in enumerate(oids):
+                value = self.device.get(oid, v1)
+                if value is None:
+                    if v1:
+                        error = ("noSuchName", c_index + 1)
+                        break
+                    value = ("noSuchObject", None)
+                var_binds.append((oid,) + value)
+        elif request_pdu.isSameTypeWith(p_mod.GetNextRequestPDU()):
+            for c_index, oid in enumerate(oids):
+                found = self.device.next(oid, v1)
+                if found is None:
+                    if v1:
+                        error = ("noSuchName", c_index + 1)
+                        break
+                    found = (oid, "endOfMibView", None)
+                var_binds.append(found)
+        elif not v1 and request_pdu.isSameTypeWith(p_mod.GetBulkRequestPDU()):
+            non_repeaters = min(int(p_mod.apiBulkPDU.getNonRepeaters(request_pdu)), len(oids))
+            max_repetitions = int(p_mod.apiBulkPDU.getMaxRepetitions(request_pdu))
+            for oid in oids[:non_repeaters]:
+                var_binds.append(self.device.next(oid) or (oid, "endOfMibView", None))
+            last_oids = oids[non_repeaters:]
+            for _ in range(max_repetitions if last_oids else 0):
+                ended = 0
+                for c_index, oid in enumerate(last_oids):
+                    found = self.device.next(oid)
+                    if found is None:
+                        ended += 1
+                        found = (oid, "endOfMibView", None)
+                    last_oids[c_index] = found[0]
+                    var_binds.append(found)
+                if ended == len(last_oids):
+                    break
+        else:
+            error = ("genErr", 0)
+
+        request_id = int(p_mod.apiPDU.getRequestID(request_pdu))
+        if error is not None:  # SNMPv1 errors return the variable bindings of the request
+            var_binds = [(oid, "null", None) for oid in oids]
+        response = self.__encode(version, community, request_id, error, var_binds)
+        if len(response) > self.max_response_size:
+            response = self.__encode(version, community, request_id, ("tooBig", 0),
+                                     [(oid, "null", None) for oid in oids] if v1 else [])
+        return response
+
+    @staticmethod
+    def __encode(version: int, community: bytes, request_id: int, error, var_binds: list) -> bytes:
+        encoded_var_binds = b"".join(ber(0x30, ber_oid(oid) + ber_value(value_type, value))
+                                     for oid, value_type, value in var_binds)
+        error_status, error_index = (ERROR_STATUS[error[0]], error[1]) if error else (0, 0)
+        pdu = ber(0xa2, ber_integer(request_id) + ber_integer(error_status) + ber_integer(error_index) +
+                  ber(0x30, encoded_var_binds))
+        return ber(0x30, ber_integer(version) + ber(0x04, community) + pdu)
+
+
+async def serve_agents(count: int, first_port: int, host: str = "127.0.0.1", interfaces: int = 24, **kwargs) -> list:
+    """starts count agents on the running loop, agent n on first_port + n"""
+    loop = asyncio.get_running_loop()
+    agents = []
+    for c_agent in range(count):
+        _, agent = await loop.create_datagram_endpoint(
+            lambda: SimulatedAgent(SimulatedDevice(c_agent, interfaces), **kwargs),
+            local_addr=(host, first_port + c_agent))
+        agents.append(agent)
+    return agents
+
+
+def start_agents(count: int, first_port: int, **kwargs) -> list:
+    """serve_agents on a background thread, for tests in the same process"""
+    started = threading.Event()
+    agents = []
+
+    def run():
+        loop = asyncio.new_event_loop()
+        agents.extend(loop.run_until_complete(serve_agents(count, first_port, **kwargs)))
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="snmpSimulator", daemon=True).start()
+    started.wait()
+    return agents
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, default=1)
+    parser.add_argument("--first-port", type=int, default=20000)
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--interfaces", type=int, default=24, help="interfaces of every simulated device")
+    parser.add_argument("--community", type=str, default="public")
+    parser.add_argument("--latency", type=float, default=0, help="seconds before every response")
+    parser.add_argument("--loss", type=float, default=0, help="ratio of requests that are dropped")
+    parser.add_argument("--max-response-size", type=int, default=65507, help="larger responses are tooBig")
+    args = parser.parse_args()
+
+    async def main():
+        await serve_agents(args.agents, args.first_port, args.host, args.interfaces, community=args.community,
+                           latency=args.latency, loss=args.loss, max_response_size=args.max_response_size)
+        print(f"serving {args.agents} agents on {args.host}:{args.first_port}-{args.first_port + args.agents - 1}",
+              flush=True)
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
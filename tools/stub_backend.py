@@ -0,0 +1,124 @@
+"""
+minimal stand-in for the netwatch backend to run one or several aggregators locally.
+
+    python tools/stub_backend.py --port 8081 --devices 100
+    IP=http://127.0.0.1:8081 VERSION=dev CLUSTER_NODE_COUNT=3 CLUSTER_NODE_INDEX=0 \\
+        CLUSTER_HEARTBEAT_DIR=/tmp/netregator python main.py
+
+every aggregator gets the same device list. GET /stub/state shows which devices each cluster node
+(X-Cluster-Node header) reported in its latest payload, how many payloads were received and how many
+static_data sections were sent or left out as unchanged. POST /stub/resend (optionally {"devices": [ids]})
+answers the next upload with "resend_static_data"
+"""
+import argparse
+import datetime
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import jwt
+
+
+class StubBackend:
+    def __init__(self, device_count: int = 10, modules: list = None, timeout: int = 10):
+        self.device_count = device_count
+        self.modules = modules if modules is not None else []
+        self.timeout = timeout
+        self.payloads = []
+        self.resend_static_data = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def token(aggregator_id: str):
+        exp = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        return jwt.encode({"sub": aggregator_id, "exp": exp}, "stub", algorithm="HS256")
+
+    def login(self):
+        return {"aggregator_id": "1", "access_token": StubBackend.token("1"), "refresh_token": StubBackend.token("1")}
+
+    def devices(self):
+        return {"devices": [{"id": str(c_id), "hostname": f"device-{c_id}", "type": "stub",
+                             "ip": f"10.{c_id // 65536 % 256}.{c_id // 256 % 256}.{c_id % 256}",
+                             "timeout": self.timeout, "modules": self.modules}
+                            for c_id in range(self.device_count)]}
+
+    def add_payload(self, client: str, payload: dict):
+        with self.lock:
+            self.payloads.append((client, payload))
+            response = {"detail": "ok"}
+            if self.resend_static_data:
+                response["resend_static_data"] = self.resend_static_data
+                self.resend_static_data = None
+            return response
+
+    def request_resend(self, device_ids: list = None):
+        with self.lock:
+            self.resend_static_data = device_ids or True
+
+    def state(self):
+        with self.lock:
+            latest = {}
+            sections = unchanged = 0
+            for client, payload in self.payloads:
+                latest[client] = sorted((c_device["id"] for c_device in payload["devices"]), key=int)
+                for c_device in payload["devices"]:
+                    sections += len(c_device.get("static_data", {}))
+                    unchanged += len(c_device.get("static_data_unchanged", []))
+            return {"payloads": len(self.payloads), "devices_by_client": latest,
+                    "static_data_sections": sections, "static_data_unchanged": unchanged}
+
+
+def create_handler(backend: StubBackend):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, data, status=200):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length)) if length else {}
+
+        def do_GET(self):
+            if self.path.startswith("/api/aggregator/"):
+                self._send(backend.devices())
+            elif self.path == "/stub/state":
+                self._send(backend.state())
+            else:
+                self._send({"detail": "not found"}, 404)
+
+        def do_POST(self):
+            payload = self._read()
+            if self.path in ("/api/aggregator-login", "/api/aggregator-refresh"):
+                self._send(backend.login())
+            elif self.path == "/api/devices/data":
+                self._send(backend.add_payload(self.headers.get("X-Cluster-Node", "0"), payload))
+            elif self.path == "/stub/resend":
+                backend.request_resend(payload.get("devices"))
+                self._send({"detail": "ok"})
+            elif self.path.startswith("/api/aggregator/"):
+                self._send({"detail": "ok"})
+            else:
+                self._send({"detail": "not found"}, 404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def create_server(backend: StubBackend, port: int = 8081):
+    return ThreadingHTTPServer(("127.0.0.1", port), create_handler(backend))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--timeout", type=int, default=10)
+    parser.add_argument("--modules", type=str, default="[]", help="module list of every device as json")
+    args = parser.parse_args()
+    stub = StubBackend(device_count=args.devices, modules=json.loads(args.modules), timeout=args.timeout)
+    create_server(stub, args.port).serve_forever()